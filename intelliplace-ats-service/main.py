@@ -7,19 +7,125 @@ import os
 os.environ['TRANSFORMERS_NO_TF'] = '1'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uvicorn
-from services.resume_parser import ResumeParser
-from services.semantic_matcher import SemanticMatcher
+from services.resume_parser import parse_resumes
+from services.semantic_matcher import ModelNotReadyError, SemanticMatcher
 from services.scoring_engine import ScoringEngine
 from services.explanation_generator import ExplanationGenerator
+from services.vector_index import VectorIndex
+from services.worker_pool import BoundedExecutor, QueueFullError
+
+# Worker pool sizing. ATS_PARSE_PROCESSES=0 parses in threads instead of
+# processes (useful where process spawning is restricted).
+ENCODE_THREADS = int(os.getenv('ATS_ENCODE_THREADS', '2'))
+PARSE_PROCESSES = int(os.getenv('ATS_PARSE_PROCESSES', str(os.cpu_count() or 1)))
+MAX_QUEUE = int(os.getenv('ATS_MAX_QUEUE', '64'))
+RETRY_AFTER_SECONDS = int(os.getenv('ATS_RETRY_AFTER_SECONDS', '2'))
+# 0 keeps retrying the model load until it succeeds
+MODEL_LOAD_ATTEMPTS = int(os.getenv('ATS_MODEL_LOAD_ATTEMPTS', '5'))
+
+# Embedding indexes for candidate retrieval
+INDEX_DIR = os.getenv('ATS_INDEX_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'var', 'index')
+INDEX_IVF_THRESHOLD = int(os.getenv('ATS_INDEX_IVF_THRESHOLD', '20000'))
+INDEX_N_PROBE = int(os.getenv('ATS_INDEX_N_PROBE', '8'))
+INDEX_PROBE_FRACTION = float(os.getenv('ATS_INDEX_PROBE_FRACTION', '0.15'))
+INDEX_FLUSH_SECONDS = float(os.getenv('ATS_INDEX_FLUSH_SECONDS', '30'))
+
+# Torch releases the GIL during encode, so threads are enough for inference;
+# the regex parser is pure Python and needs processes to use more than one core.
+encode_pool = BoundedExecutor(
+    "encode",
+    lambda: ThreadPoolExecutor(max_workers=ENCODE_THREADS, thread_name_prefix="ats-encode"),
+    max_pending=MAX_QUEUE,
+    retry_after=RETRY_AFTER_SECONDS
+)
+# Parse workers start lazily, possibly while the model-loader thread is inside
+# torch/tokenizers; forking then could copy held locks into the child. A fork
+# server (or spawn where unavailable) starts them from a clean process.
+PARSE_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+parse_pool = BoundedExecutor(
+    "parse",
+    lambda: (
+        ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=PARSE_MP_CONTEXT)
+        if PARSE_PROCESSES > 0
+        else ThreadPoolExecutor(max_workers=1, thread_name_prefix="ats-parse")
+    ),
+    max_pending=MAX_QUEUE,
+    retry_after=RETRY_AFTER_SECONDS
+)
+
+resume_index = VectorIndex(
+    os.path.join(INDEX_DIR, 'resumes'),
+    ivf_threshold=INDEX_IVF_THRESHOLD,
+    n_probe=INDEX_N_PROBE,
+    probe_fraction=INDEX_PROBE_FRACTION
+)
+job_index = VectorIndex(
+    os.path.join(INDEX_DIR, 'jobs'),
+    ivf_threshold=INDEX_IVF_THRESHOLD,
+    n_probe=INDEX_N_PROBE,
+    probe_fraction=INDEX_PROBE_FRACTION
+)
+
+
+def save_indexes():
+    resume_index.save()
+    job_index.save()
+
+
+async def flush_indexes():
+    """Persist index changes periodically instead of on every upsert."""
+    while True:
+        await asyncio.sleep(INDEX_FLUSH_SECONDS)
+        await asyncio.get_running_loop().run_in_executor(None, save_indexes)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    encode_pool.start()
+    parse_pool.start()
+    # Load and warm the model in the background so the port binds immediately;
+    # until it is ready, requests are served by the TF-IDF fallback and /ready
+    # reports 503.
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, semantic_matcher.tfidf.load)
+    # Daemon thread: with ATS_MODEL_LOAD_ATTEMPTS=0 the retries never end on
+    # their own, and a default-executor thread would hold up interpreter exit
+    threading.Thread(
+        target=semantic_matcher.load_model, args=(MODEL_LOAD_ATTEMPTS,),
+        name='model-load', daemon=True
+    ).start()
+    await loop.run_in_executor(None, resume_index.load)
+    await loop.run_in_executor(None, job_index.load)
+    # Clustering a large pool takes a while; it runs on its own thread and
+    # search stays exact until the new structures are swapped in
+    resume_index.maybe_build_ivf()
+    flusher = asyncio.create_task(flush_indexes())
+    yield
+    flusher.cancel()
+    semantic_matcher.stop_loading()
+    await semantic_matcher.batcher.close()
+    encode_pool.shutdown()
+    parse_pool.shutdown()
+    save_indexes()
+
 
 app = FastAPI(
     title="IntelliPlace ATS Service",
     description="AI-powered resume evaluation and candidate ranking",
-    version="1.0.0" 
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
@@ -33,6 +139,29 @@ class ResumeEvaluationRequest(BaseModel):
     education_requirement: Optional[str] = Field(default=None, description="Required education degree (e.g., 'Bachelor', 'Master')")
 
 
+class JobSpec(BaseModel):
+    job_title: str = Field(..., description="Job title/role (e.g., 'Software Engineer', 'Data Scientist')")
+    job_description: str = Field(..., description="Complete job description text")
+    job_description_pdf_text: Optional[str] = Field(default=None, description="Text extracted from job description PDF file (if available)")
+    required_skills: List[str] = Field(default=[], description="List of required technical skills")
+    min_experience_years: Optional[float] = Field(default=0.0, description="Minimum years of experience required")
+    education_requirement: Optional[str] = Field(default=None, description="Required education degree (e.g., 'Bachelor', 'Master')")
+
+
+class BatchResumeEvaluationRequest(JobSpec):
+    resumes: List[str] = Field(..., description="Full text content of each resume, in the order results should be returned")
+
+
+class ResumeIndexRequest(BaseModel):
+    resume_text: str = Field(..., description="Full text content of the resume")
+
+
+class RecommendJobsRequest(BaseModel):
+    resume_text: Optional[str] = Field(default=None, description="Resume text (used when resume_id is not indexed)")
+    resume_id: Optional[str] = Field(default=None, description="Id of a resume already in the candidate index")
+    k: int = Field(default=10, ge=1, le=200, description="Number of jobs to return")
+
+
 class FeatureScores(BaseModel):
     semantic_similarity: float = Field(..., ge=0.0, le=1.0)
     role_similarity: float = Field(..., ge=0.0, le=1.0)
@@ -50,9 +179,49 @@ class ResumeEvaluationResponse(BaseModel):
     parsed_resume: dict = Field(..., description="Structured resume data extracted by NLP")
 
 
+class BatchResumeEvaluationResponse(BaseModel):
+    results: List[ResumeEvaluationResponse] = Field(..., description="One evaluation per resume, in input order")
+
+
+class ResumeIndexResponse(BaseModel):
+    resume_id: str
+    indexed: bool
+    pool_size: int
+
+
+class JobIndexResponse(BaseModel):
+    job_id: str
+    indexed: bool
+    pool_size: int
+
+
+class RecommendedJob(BaseModel):
+    job_id: str
+    job_title: str
+    score: float = Field(..., ge=0.0, le=1.0, description="Embedding similarity between resume and job")
+
+
+class RecommendJobsResponse(BaseModel):
+    jobs: List[RecommendedJob]
+    pool_size: int = Field(..., description="Open jobs in the index")
+
+
+class RankedCandidate(BaseModel):
+    resume_id: str
+    retrieval_score: float = Field(..., ge=0.0, le=1.0, description="Embedding similarity used to shortlist the candidate")
+    evaluation: ResumeEvaluationResponse
+
+
+class TopCandidatesResponse(BaseModel):
+    job_id: str
+    pool_size: int = Field(..., description="Resumes in the index")
+    shortlist_size: int = Field(..., description="Resumes retrieved and fully scored")
+    search_mode: str = Field(..., description="exact or ivf")
+    candidates: List[RankedCandidate] = Field(..., description="Top candidates by final score")
+
+
 # Initialize services (singleton pattern)
-resume_parser = ResumeParser()
-semantic_matcher = SemanticMatcher()
+semantic_matcher = SemanticMatcher(run_in_executor=encode_pool.run)
 scoring_engine = ScoringEngine()
 explanation_generator = ExplanationGenerator()
 
@@ -68,7 +237,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "model": semantic_matcher.status(),
+        "tfidf_fallback": semantic_matcher.tfidf.stats(),
+        "embedding_cache": semantic_matcher.cache.stats(),
+        "worker_pools": {
+            "encode": encode_pool.stats(),
+            "parse": parse_pool.stats()
+        },
+        "micro_batching": semantic_matcher.batcher.stats(),
+        "indexes": {
+            "resumes": resume_index.stats(),
+            "jobs": job_index.stats()
+        }
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the model is warm, 503 while it is still loading
+    or after loading failed and the service is degraded to the TF-IDF fallback.
+    """
+    status = semantic_matcher.status()
+    if status["state"] == "ready":
+        return {"ready": True, "mode": "transformer", "model": status}
+    return JSONResponse(
+        status_code=503,
+        content={"ready": False, "mode": "tfidf_fallback", "model": status},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
 
 
 @app.post("/evaluate-resume", response_model=ResumeEvaluationResponse)
@@ -84,85 +283,369 @@ async def evaluate_resume(request: ResumeEvaluationRequest):
     5. Generate decision and explanation
     """
     try:
-        # STEP 1: Resume Parsing
-        parsed_resume = resume_parser.parse(request.resume_text)
-        
-        # STEP 2: Semantic Matching
-        # Compute similarity with job description (includes PDF text if available)
-        semantic_similarity = semantic_matcher.compute_similarity(
-            request.resume_text,
-            request.job_description,
-            request.job_description_pdf_text
+        # STEPS 1-2: Resume parsing and semantic matching run concurrently,
+        # off the event loop. Embedding requests from concurrent evaluations
+        # are coalesced into shared batches by the matcher.
+        (parsed_resume,), (semantic_similarity, role_similarity) = await asyncio.gather(
+            parse_pool.run(parse_resumes, [request.resume_text]),
+            # Similarity with job description (includes PDF text if available)
+            # and with the role/title, from one encode of the resume
+            semantic_matcher.compute_similarities_async(
+                request.resume_text,
+                request.job_title,
+                request.job_description,
+                request.job_description_pdf_text
+            )
         )
         
-        # Compute role/title similarity
-        role_similarity = semantic_matcher.compute_role_similarity(
-            request.resume_text,
-            request.job_title
+        # STEPS 3-5: Feature engineering, scoring and decision
+        return build_evaluation(
+            request,
+            parsed_resume,
+            semantic_similarity,
+            role_similarity
         )
         
-        # STEP 3: Feature Engineering
-        skill_match_ratio = scoring_engine.calculate_skill_match(
-            parsed_resume.get('skills', []),
-            request.required_skills
+    except QueueFullError as e:
+        raise overloaded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error evaluating resume: {str(e)}"
         )
+
+
+@app.post("/evaluate-resume-batch", response_model=BatchResumeEvaluationResponse)
+async def evaluate_resume_batch(request: BatchResumeEvaluationRequest):
+    """
+    Evaluate a whole applicant pool against one job in a single call.
+
+    The job description and title are embedded once, all resumes are encoded
+    in one batched pass, and results are returned in the input order.
+    """
+    try:
+        results = await evaluate_many(request, request.resumes)
+        return BatchResumeEvaluationResponse(results=results)
         
-        experience_score = scoring_engine.calculate_experience_score(
-            parsed_resume.get('experience_years', 0),
-            request.min_experience_years
+    except QueueFullError as e:
+        raise overloaded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error evaluating resume batch: {str(e)}"
         )
-        
-        project_score = scoring_engine.calculate_project_score(
-            parsed_resume.get('project_count', 0),
-            parsed_resume.get('internship_count', 0)
+
+
+@app.put("/resumes/{resume_id}", response_model=ResumeIndexResponse)
+async def index_resume(resume_id: str, request: ResumeIndexRequest):
+    """Add or update a resume in the candidate index (call on CV upload/change)."""
+    try:
+        vector = (await semantic_matcher.embed_resumes([request.resume_text]))[0]
+        # The text goes to the index's document store, read back only for
+        # shortlisted candidates
+        await encode_pool.run(
+            resume_index.upsert, resume_id, vector, {}, request.resume_text
         )
-        
-        education_match_score = scoring_engine.calculate_education_match(
-            parsed_resume.get('education_degree', ''),
-            request.education_requirement
+        return ResumeIndexResponse(resume_id=resume_id, indexed=True, pool_size=len(resume_index))
+    except ModelNotReadyError as e:
+        raise model_not_ready(e)
+    except QueueFullError as e:
+        raise overloaded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error indexing resume: {str(e)}"
         )
-        
-        # STEP 4: Weighted Scoring
-        feature_scores = FeatureScores(
-            semantic_similarity=semantic_similarity,
-            role_similarity=role_similarity,
-            skill_match_ratio=skill_match_ratio,
-            experience_score=experience_score,
-            project_score=project_score,
-            education_match_score=education_match_score
+
+
+@app.delete("/resumes/{resume_id}", response_model=ResumeIndexResponse)
+async def remove_resume(resume_id: str):
+    """Drop a resume from the candidate index."""
+    try:
+        # Removal can wait on the index lock during a rebuild swap; keep it off the loop
+        await encode_pool.run(resume_index.remove, resume_id)
+    except QueueFullError as e:
+        raise overloaded(e)
+    return ResumeIndexResponse(resume_id=resume_id, indexed=False, pool_size=len(resume_index))
+
+
+@app.put("/jobs/{job_id}", response_model=JobIndexResponse)
+async def index_job(job_id: str, request: JobSpec):
+    """Add or update an open job in the recommendation index (call on job create/edit)."""
+    try:
+        vector = await semantic_matcher.embed_job(
+            request.job_description, request.job_description_pdf_text
         )
-        
-        final_score = scoring_engine.compute_final_score(feature_scores)
-        
-        # STEP 5: Decision Logic
-        if final_score >= 0.75:
-            decision = "SHORTLISTED"
-        elif final_score >= 0.60:
-            decision = "REVIEW"
+        await encode_pool.run(job_index.upsert, job_id, vector, request.model_dump())
+        return JobIndexResponse(job_id=job_id, indexed=True, pool_size=len(job_index))
+    except ModelNotReadyError as e:
+        raise model_not_ready(e)
+    except QueueFullError as e:
+        raise overloaded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error indexing job: {str(e)}"
+        )
+
+
+@app.delete("/jobs/{job_id}", response_model=JobIndexResponse)
+async def remove_job(job_id: str):
+    """Drop a job from the recommendation index (call when it closes)."""
+    try:
+        # Removal can wait on the index lock during a rebuild swap; keep it off the loop
+        await encode_pool.run(job_index.remove, job_id)
+    except QueueFullError as e:
+        raise overloaded(e)
+    return JobIndexResponse(job_id=job_id, indexed=False, pool_size=len(job_index))
+
+
+@app.post("/students/recommend", response_model=RecommendJobsResponse)
+async def recommend_jobs(request: RecommendJobsRequest):
+    """
+    Open jobs closest to a student's resume.
+
+    Uses the indexed resume embedding when `resume_id` is known, otherwise
+    embeds `resume_text`; ranking is one matrix-vector product over the job index.
+    """
+    try:
+        vector = resume_index.get_vector(request.resume_id) if request.resume_id else None
+        if vector is None:
+            if not request.resume_text:
+                raise HTTPException(
+                    status_code=404 if request.resume_id else 422,
+                    detail="Resume not indexed; provide resume_text" if request.resume_id
+                    else "Provide resume_text or resume_id"
+                )
+            vector = (await semantic_matcher.embed_resumes([request.resume_text]))[0]
+        hits = await encode_pool.run(job_index.search, vector, request.k)
+        return RecommendJobsResponse(
+            jobs=[
+                RecommendedJob(
+                    job_id=job_id,
+                    job_title=(job_index.get_metadata(job_id) or {}).get("job_title", ""),
+                    score=max(0.0, min(1.0, (sim + 1) / 2))
+                )
+                for job_id, sim in hits
+            ],
+            pool_size=len(job_index)
+        )
+    except HTTPException:
+        raise
+    except ModelNotReadyError as e:
+        raise model_not_ready(e)
+    except QueueFullError as e:
+        raise overloaded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error recommending jobs: {str(e)}"
+        )
+
+
+@app.post("/jobs/{job_id}/top-candidates", response_model=TopCandidatesResponse)
+async def top_candidates(
+    job_id: str,
+    request: Optional[JobSpec] = None,
+    k: int = Query(20, ge=1, le=1000, description="Number of candidates to return"),
+    shortlist: Optional[int] = Query(None, ge=1, le=10000, description="Resumes to retrieve before full scoring (default max(5k, 50))")
+):
+    """
+    Rank the indexed resume pool for a job.
+
+    Nearest resumes are retrieved by cosine similarity to the job embedding
+    (exact for small pools, IVF for large ones); only that shortlist goes
+    through the full ScoringEngine pipeline. The job spec can be omitted
+    for jobs registered with PUT /jobs/{id}.
+    """
+    try:
+        if request is None:
+            spec = job_index.get_metadata(job_id)
+            if spec is None:
+                raise HTTPException(status_code=404, detail="Job not indexed; send the job spec in the body")
+            request = JobSpec(**spec)
+            job_vector = job_index.get_vector(job_id)
         else:
-            decision = "REJECTED"
-        
-        # Generate explanation
-        explanation = explanation_generator.generate(
-            final_score=final_score,
-            feature_scores=feature_scores,
-            decision=decision,
-            parsed_resume=parsed_resume
+            job_vector = await semantic_matcher.embed_job(
+                request.job_description, request.job_description_pdf_text
+            )
+        hits, texts, resume_vectors = await encode_pool.run(
+            shortlist_resumes, job_vector, shortlist or max(5 * k, 50)
         )
+        # With the model up, similarities come from the stored embeddings and
+        # the shortlist is not run through the transformer again
+        similarities = None
+        if semantic_matcher.model_state == "ready":
+            similarities = await semantic_matcher.similarities_from_embeddings(
+                resume_vectors, job_vector, request.job_title
+            )
+        evaluations = await evaluate_many(request, texts, similarities)
         
-        return ResumeEvaluationResponse(
-            final_score=final_score,
-            decision=decision,
-            feature_scores=feature_scores,
-            explanation=explanation,
-            parsed_resume=parsed_resume
+        ranked = sorted(
+            (
+                RankedCandidate(
+                    resume_id=resume_id,
+                    retrieval_score=max(0.0, min(1.0, (sim + 1) / 2)),
+                    evaluation=evaluation
+                )
+                for (resume_id, sim), evaluation in zip(hits, evaluations)
+            ),
+            key=lambda c: c.evaluation.final_score,
+            reverse=True
         )
-        
+        return TopCandidatesResponse(
+            job_id=job_id,
+            pool_size=len(resume_index),
+            shortlist_size=len(hits),
+            search_mode=resume_index.mode,
+            candidates=ranked[:k]
+        )
+    except HTTPException:
+        raise
+    except ModelNotReadyError as e:
+        raise model_not_ready(e)
+    except QueueFullError as e:
+        raise overloaded(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error evaluating resume: {str(e)}"
+            detail=f"Error ranking candidates: {str(e)}"
+        )
+
+
+def shortlist_resumes(job_vector, size: int) -> tuple:
+    """
+    Nearest indexed resumes to a job: (hits, texts, vectors) for those that
+    still have their text (one may be removed between search and read).
+    """
+    hits = resume_index.search(job_vector, size)
+    texts = resume_index.get_documents([resume_id for resume_id, _ in hits])
+    kept = [(hit, text) for hit, text in zip(hits, texts) if text is not None]
+    hits = [hit for hit, _ in kept]
+    vectors = resume_index.get_vectors([resume_id for resume_id, _ in hits])
+    return hits, [text for _, text in kept], vectors
+
+
+async def evaluate_many(job, resume_texts: list, similarities: list = None) -> list:
+    """
+    Evaluate several resumes against one job spec, preserving order.
+
+    Parsing is split into one chunk per worker process; the job text is
+    embedded once and all resumes are encoded in one batched pass, unless
+    `similarities` ((semantic, role) per resume) are already known.
+    """
+    chunk_size = max(1, -(-len(resume_texts) // max(PARSE_PROCESSES, 1)))
+    chunks = [
+        resume_texts[i:i + chunk_size]
+        for i in range(0, len(resume_texts), chunk_size)
+    ]
+    parsing = asyncio.gather(*(parse_pool.run(parse_resumes, chunk) for chunk in chunks))
+    if similarities is None:
+        parsed_chunks, similarities = await asyncio.gather(
+            parsing,
+            encode_pool.run(
+                semantic_matcher.compute_batch_similarities,
+                resume_texts,
+                job.job_title,
+                job.job_description,
+                job.job_description_pdf_text
+            )
         )
+    else:
+        parsed_chunks = await parsing
+    parsed_resumes = [parsed for chunk in parsed_chunks for parsed in chunk]
+    return [
+        build_evaluation(job, parsed_resume, semantic_similarity, role_similarity)
+        for parsed_resume, (semantic_similarity, role_similarity)
+        in zip(parsed_resumes, similarities)
+    ]
+
+
+def model_not_ready(error: ModelNotReadyError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Embedding model not ready: {error}",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+def overloaded(error: QueueFullError) -> HTTPException:
+    """503 telling the caller when to retry."""
+    return HTTPException(
+        status_code=503,
+        detail=f"ATS service is at capacity ({error.pool_name} queue full), retry later",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def build_evaluation(
+    job,
+    parsed_resume: dict,
+    semantic_similarity: float,
+    role_similarity: float
+) -> ResumeEvaluationResponse:
+    """
+    Turn parsed resume data and similarity scores into a full evaluation.
+
+    `job` is any request model carrying the job spec fields
+    (required_skills, min_experience_years, education_requirement).
+    """
+    # STEP 3: Feature Engineering
+    skill_match_ratio = scoring_engine.calculate_skill_match(
+        parsed_resume.get('skills', []),
+        job.required_skills
+    )
+    
+    experience_score = scoring_engine.calculate_experience_score(
+        parsed_resume.get('experience_years', 0),
+        job.min_experience_years
+    )
+    
+    project_score = scoring_engine.calculate_project_score(
+        parsed_resume.get('project_count', 0),
+        parsed_resume.get('internship_count', 0)
+    )
+    
+    education_match_score = scoring_engine.calculate_education_match(
+        parsed_resume.get('education_degree', ''),
+        job.education_requirement
+    )
+    
+    # STEP 4: Weighted Scoring
+    feature_scores = FeatureScores(
+        semantic_similarity=semantic_similarity,
+        role_similarity=role_similarity,
+        skill_match_ratio=skill_match_ratio,
+        experience_score=experience_score,
+        project_score=project_score,
+        education_match_score=education_match_score
+    )
+    
+    final_score = scoring_engine.compute_final_score(feature_scores)
+    
+    # STEP 5: Decision Logic
+    if final_score >= 0.75:
+        decision = "SHORTLISTED"
+    elif final_score >= 0.60:
+        decision = "REVIEW"
+    else:
+        decision = "REJECTED"
+    
+    # Generate explanation
+    explanation = explanation_generator.generate(
+        final_score=final_score,
+        feature_scores=feature_scores,
+        decision=decision,
+        parsed_resume=parsed_resume
+    )
+    
+    return ResumeEvaluationResponse(
+        final_score=final_score,
+        decision=decision,
+        feature_scores=feature_scores,
+        explanation=explanation,
+        parsed_resume=parsed_resume
+    )
 
 
 if __name__ == "__main__":
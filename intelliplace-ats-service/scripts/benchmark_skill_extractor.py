@@ -0,0 +1,121 @@
+"""
+Benchmark ResumeParser parse time against skills-taxonomy size.
+
+Usage (from intelliplace-ats-service/):
+    python scripts/benchmark_skill_extractor.py [--resumes 200] [--sizes 1000,5000,20000]
+
+The bundled taxonomy is padded with synthetic aliases to reach each size; the
+legacy per-call regex parser is timed as a baseline.
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.resume_parser import ResumeParser  # noqa: E402
+from services.skill_extractor import DEFAULT_TAXONOMY_PATH, SkillExtractor, load_taxonomy  # noqa: E402
+
+SAMPLE_RESUME = """
+Jane Doe - Software Engineer
+B.Tech in Computer Science, 2022. Currently pursuing M.Tech.
+3+ years of experience building web applications with Python, Django, React.js and Node.js.
+Internship: Backend intern at Acme Corp, built REST APIs with FastAPI and PostgreSQL.
+Internship: Data science internship, trained machine learning models with scikit-learn and PyTorch.
+Project 1: Real-time chat app using Socket.IO, Redis and Docker, deployed on AWS with Kubernetes.
+Project 2: Developed a recommendation engine processing two million events with Apache Spark.
+Skills: Java, C++, TypeScript, MongoDB, Git, CI/CD, Terraform, Linux, Agile, Scrum.
+Strong communication, leadership and problem solving; excellent teamwork.
+"""
+
+
+def legacy_parse(resume_text: str) -> dict:
+    """The parser as it was before the single-pass extractor (patterns rebuilt per call)."""
+    text = (resume_text or "").strip().lower()
+    result = {"skills": [], "internship_count": 0, "education_degree": ""}
+    skill_patterns = [
+        r'\b(python|java|javascript|react|node\.?js|c\+\+|sql|mongodb|aws|docker|git|machine learning|ml|data science)\b',
+        r'\b(html|css|typescript|angular|vue|express|django|flask|fastapi)\b',
+        r'\b(communication|leadership|teamwork|problem solving|analytical)\b',
+    ]
+    seen = set()
+    for pat in skill_patterns:
+        for m in re.finditer(pat, text, re.I):
+            s = m.group(1).strip()
+            if s not in seen:
+                seen.add(s)
+                result["skills"].append(s)
+    re.search(r'(\d+(?:\.\d+)?)\s*[+]?\s*(?:years?|yrs?|yoe)', text, re.I)
+    re.findall(r'\b(?:project|developed|built)\b.*?(?:\d+|one|two|three)', text, re.I)
+    re.findall(r'project\s*[#:]?\s*\d+', text, re.I)
+    result["internship_count"] = min(len(re.findall(r'\bintern(?:ship)?\b', text, re.I)), 5)
+    for pat, label in [
+        (r'phd|doctorate', 'phd'),
+        (r'm\.?tech|mtech|m\.?s\.?|ms|masters?', 'masters'),
+        (r'b\.?tech|btech|b\.?e\.?|be|bachelor|b\.?s\.?|bs', 'bachelor'),
+        (r'bca', 'bca'),
+        (r'mca', 'mca'),
+    ]:
+        if re.search(rf'\b{pat}\b', text):
+            result["education_degree"] = label
+            break
+    return result
+
+
+def synthetic_taxonomy(size: int, seed: int = 7) -> dict:
+    aliases = load_taxonomy(DEFAULT_TAXONOMY_PATH)
+    rng = random.Random(seed)
+    while len(aliases) < size:
+        words = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        term = " ".join(words)
+        aliases.setdefault(term, term)
+    return aliases
+
+
+def time_per_resume(fn, resumes: list) -> float:
+    start = time.perf_counter()
+    for text in resumes:
+        fn(text)
+    return (time.perf_counter() - start) / len(resumes) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=200, help="Resumes parsed per measurement")
+    parser.add_argument("--sizes", default="1000,5000,20000", help="Comma-separated taxonomy sizes")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    lines = SAMPLE_RESUME.strip().splitlines()
+    resumes = []
+    for _ in range(args.resumes):
+        rng.shuffle(lines)
+        resumes.append("\n".join(lines * 4))
+
+    print(f"{'parser':<28}{'taxonomy terms':>16}{'compile ms':>12}{'ms/resume':>12}")
+    print(f"{'legacy regex':<28}{30:>16}{'-':>12}{time_per_resume(legacy_parse, resumes):>12.3f}")
+
+    bundled = load_taxonomy(DEFAULT_TAXONOMY_PATH)
+    configs = [("single-pass (bundled)", bundled)]
+    configs += [
+        ("single-pass (synthetic)", synthetic_taxonomy(int(n)))
+        for n in args.sizes.split(",") if n.strip()
+    ]
+    for label, aliases in configs:
+        start = time.perf_counter()
+        extractor = SkillExtractor(aliases)
+        compile_ms = (time.perf_counter() - start) * 1000
+        resume_parser = ResumeParser(extractor)
+        per_resume = time_per_resume(resume_parser.parse, resumes)
+        print(f"{label:<28}{extractor.size:>16}{compile_ms:>12.1f}{per_resume:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Build a full skills taxonomy from public skill datasets, merged over the seed.
+
+Usage (from intelliplace-ats-service/):
+    python scripts/build_skills_taxonomy.py SOURCE [SOURCE ...] [--output data/skills_taxonomy.full.json]
+
+Each SOURCE is one of:
+  - ESCO skills CSV (skills_en.csv from the ESCO download): preferredLabel is
+    the canonical name, altLabels (one per line) the aliases, skillType the
+    category.
+  - O*NET "Technology Skills.txt" (tab-separated): Example is the skill,
+    Commodity Title the category.
+  - Any CSV with a "skill" column and optional "aliases" ("|"-separated) and
+    "category" columns.
+
+Entries of the seed taxonomy (data/skills_taxonomy.json) come first, so its
+canonical names and aliases win over the imported ones; new aliases of a
+skill the seed already knows are added under the seed's canonical name.
+Labels longer than --max-words never occur verbatim in a resume and are
+dropped. Point ATS_SKILLS_TAXONOMY at the output file to use it.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_extractor import DEFAULT_TAXONOMY_PATH, load_taxonomy  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(DEFAULT_TAXONOMY_PATH), "skills_taxonomy.full.json")
+
+
+def read_rows(path: str):
+    """(category, canonical, aliases) for each skill in `path`."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        dialect = "excel-tab" if path.endswith((".txt", ".tsv")) else "excel"
+        reader = csv.DictReader(f, dialect=dialect)
+        fields = set(reader.fieldnames or [])
+        for row in reader:
+            if {"preferredLabel", "altLabels"} <= fields:
+                yield row.get("skillType") or "esco", row["preferredLabel"], (row["altLabels"] or "").split("\n")
+            elif {"Example", "Commodity Title"} <= fields:
+                yield row["Commodity Title"], row["Example"], []
+            elif "skill" in fields:
+                yield row.get("category") or "imported", row["skill"], (row.get("aliases") or "").split("|")
+            else:
+                raise ValueError(f"{path}: unrecognised columns {sorted(fields)}")
+
+
+def clean(label: str) -> str:
+    return " ".join((label or "").split()).lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="ESCO CSV, O*NET TSV or generic skill CSV files")
+    parser.add_argument("--seed", default=DEFAULT_TAXONOMY_PATH, help="Taxonomy merged in first")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--min-length", type=int, default=2, help="Shortest label kept, in characters")
+    parser.add_argument("--max-words", type=int, default=5, help="Longest label kept, in words")
+    args = parser.parse_args()
+
+    with open(args.seed, encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    skills = taxonomy.setdefault("skills", {})
+    # label -> canonical name for everything mapped so far; earlier entries win
+    taken = load_taxonomy(args.seed)
+
+    def usable(label):
+        return len(label) >= args.min_length and len(label.split()) <= args.max_words
+
+    imported = aliases = 0
+    for path in args.sources:
+        for category, canonical, names in read_rows(path):
+            canonical = clean(canonical)
+            if not usable(canonical):
+                continue
+            known = canonical in taken
+            canonical = taken.get(canonical, canonical)
+            names = [
+                n for n in dict.fromkeys(clean(n) for n in names)
+                if usable(n) and n not in taken and n != canonical
+            ]
+            if known and not names:
+                continue
+            entries = skills.setdefault(clean(category) or "imported", {})
+            entries[canonical] = entries.get(canonical, []) + names
+            for label in [canonical] + names:
+                taken.setdefault(label, canonical)
+            imported += not known
+            aliases += len(names)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(taxonomy, f, indent=1, ensure_ascii=False)
+    total = load_taxonomy(args.output)
+    print(f"Imported {imported} skills and {aliases} aliases; {args.output} maps "
+          f"{len(total)} labels to {len(set(total.values()))} skills")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fit the TF-IDF fallback vectorizer on historical resumes and job descriptions.
+
+Usage (from intelliplace-ats-service/):
+    python scripts/fit_tfidf.py CORPUS [CORPUS ...] [--output data/tfidf_vectorizer.joblib]
+
+Each CORPUS is a directory of .txt files, a .txt file (one document per
+blank-line-separated block) or a .jsonl file whose records have a "text",
+"resume_text" or "job_description" field.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tfidf_fallback import DEFAULT_MODEL_PATH, TfidfFallback  # noqa: E402
+
+TEXT_FIELDS = ("text", "resume_text", "job_description")
+
+
+def read_documents(path: str):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), encoding="utf-8", errors="ignore") as f:
+                    yield f.read()
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                for field in TEXT_FIELDS:
+                    if record.get(field):
+                        yield record[field]
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for block in f.read().split("\n\n"):
+                if block.strip():
+                    yield block
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the ATS TF-IDF fallback vectorizer")
+    parser.add_argument("corpus", nargs="+", help="Corpus files or directories")
+    parser.add_argument("--output", default=os.getenv("ATS_TFIDF_MODEL_PATH") or DEFAULT_MODEL_PATH)
+    parser.add_argument("--max-features", type=int, default=50000)
+    args = parser.parse_args()
+
+    documents = [doc for path in args.corpus for doc in read_documents(path)]
+    if len(documents) < 2:
+        sys.exit("Need at least two documents to fit a vectorizer")
+
+    fallback = TfidfFallback(args.output)
+    fallback.fit(documents, max_features=args.max_features)
+    fallback.save()
+    print(f"Fitted on {len(documents)} documents; vocabulary size "
+          f"{fallback.stats()['vocabulary_size']}; saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Content-addressed embedding cache.
+Keys are a hash of the model name plus the normalized, truncated text, so a
+resume or job description is only run through the transformer once.
+
+Two tiers:
+  - a bounded in-memory LRU
+  - an optional persistent tier on local disk (memory-mapped float32 matrix
+    plus an append-only index file), used as a ring buffer
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return " ".join((text or "").split())
+
+
+class DiskEmbeddingStore:
+    """Fixed-capacity embedding matrix on disk, overwritten oldest-first when full."""
+
+    MATRIX_FILE = "embeddings.f32"
+    INDEX_FILE = "index.tsv"
+    META_FILE = "meta.json"
+
+    def __init__(self, directory: str, model_name: str, capacity: int = 200000):
+        self.directory = directory
+        self.model_name = model_name
+        self.capacity = capacity
+        self.dim = None
+        self._matrix = None
+        self._key_to_row = {}
+        self._row_to_key = {}
+        self._next_row = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        try:
+            with open(self._path(self.META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get("model") != self.model_name or meta.get("capacity") != self.capacity:
+            # Written by a different model or with a different size; start over.
+            return
+        self.dim = int(meta["dim"])
+        self._matrix = np.memmap(
+            self._path(self.MATRIX_FILE), dtype=np.float32, mode="r+",
+            shape=(self.capacity, self.dim)
+        )
+        writes = 0
+        last_row = -1
+        try:
+            with open(self._path(self.INDEX_FILE)) as f:
+                for line in f:
+                    key, _, row = line.rstrip("\n").partition("\t")
+                    if not row:
+                        continue
+                    last_row = int(row)
+                    self._row_to_key[last_row] = key
+                    writes += 1
+        except OSError:
+            pass
+        self._key_to_row = {k: r for r, k in self._row_to_key.items()}
+        # Rows are filled in ring order, so the slot after the last write is next.
+        self._next_row = last_row + 1
+        if writes > 2 * self.capacity:
+            self._compact_index()
+
+    def _compact_index(self):
+        """Rewrite the index with one line per live row, oldest first."""
+        tmp = self._path(self.INDEX_FILE + ".tmp")
+        position = self._next_row % self.capacity
+        rows = sorted(self._row_to_key, key=lambda r: (r - position) % self.capacity)
+        with open(tmp, "w") as f:
+            for row in rows:
+                f.write(f"{self._row_to_key[row]}\t{row}\n")
+        os.replace(tmp, self._path(self.INDEX_FILE))
+
+    def _create(self, dim: int):
+        self.dim = dim
+        self._matrix = np.memmap(
+            self._path(self.MATRIX_FILE), dtype=np.float32, mode="w+",
+            shape=(self.capacity, dim)
+        )
+        open(self._path(self.INDEX_FILE), "w").close()
+        with open(self._path(self.META_FILE), "w") as f:
+            json.dump({"model": self.model_name, "dim": dim, "capacity": self.capacity}, f)
+
+    def __len__(self):
+        return len(self._key_to_row)
+
+    def get(self, key: str):
+        row = self._key_to_row.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def put_many(self, items):
+        if not items:
+            return
+        if self._matrix is None:
+            self._create(len(items[0][1]))
+        lines = []
+        for key, vector in items:
+            if key in self._key_to_row:
+                continue
+            row = self._next_row % self.capacity
+            old_key = self._row_to_key.get(row)
+            if old_key is not None:
+                del self._key_to_row[old_key]
+                self.evictions += 1
+            self._matrix[row] = vector
+            self._row_to_key[row] = key
+            self._key_to_row[key] = row
+            self._next_row += 1
+            lines.append(f"{key}\t{row}\n")
+        if lines:
+            self._matrix.flush()
+            with open(self._path(self.INDEX_FILE), "a") as f:
+                f.writelines(lines)
+
+
+class EmbeddingCache:
+    """Thread-safe LRU embedding cache with an optional disk tier."""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 20000,
+        disk_dir=None,
+        disk_capacity: int = 200000
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskEmbeddingStore(disk_dir, model_name, disk_capacity) if disk_dir else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def has_disk_tier(self) -> bool:
+        """True when lookups and writes may block on disk I/O."""
+        return self._disk is not None
+
+    def make_key(self, text: str) -> str:
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, keys: list) -> list:
+        """Return the cached vector for each key, or None where missing."""
+        results = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                elif self._disk is not None and (vector := self._disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, keys: list, vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if self._disk is not None:
+                self._disk.put_many(list(zip(keys, vectors)))
+
+    def _remember(self, key: str, vector) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "disk_entries": len(self._disk) if self._disk is not None else None,
+                "disk_evictions": self._disk.evictions if self._disk is not None else None,
+            }
@@ -0,0 +1,37 @@
+"""
+Lightweight in-process metrics for tuning the service.
+"""
+import bisect
+import threading
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts, Prometheus style)."""
+
+    def __init__(self, buckets: list):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = {}
+            running = 0
+            for bound, count in zip(self.buckets, self._counts):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = self._count
+            return {
+                "buckets": cumulative,
+                "count": self._count,
+                "sum": round(self._sum, 4),
+                "mean": round(self._sum / self._count, 4) if self._count else 0.0,
+            }
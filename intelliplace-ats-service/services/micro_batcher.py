@@ -0,0 +1,108 @@
+"""
+Dynamic micro-batching for embedding requests.
+Concurrent callers each submit a few texts; the batcher coalesces them for up
+to `max_wait_ms` or `max_batch_size` texts, runs one batched encode and fans the
+vectors back out to the waiting futures.
+"""
+import asyncio
+import time
+
+from services.metrics import Histogram
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        encode_fn,
+        run_in_executor=None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        encode_fn: blocking callable mapping a list of texts to an array with
+            one row per text.
+        run_in_executor: coroutine function `run(fn, *args)` used to call
+            encode_fn off the event loop; defaults to the loop's executor.
+        """
+        self.encode_fn = encode_fn
+        self.run_in_executor = run_in_executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._worker = None
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000])
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+
+    async def submit(self, texts: list):
+        """Encode `texts` as part of the next batch; returns one row per text."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(texts), future, time.perf_counter()))
+        return await future
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self) -> list:
+        """Wait for one item, then gather more until the batch is full or the window closes."""
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        size = len(items[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            started = time.perf_counter()
+            texts = []
+            for item_texts, _, enqueued in items:
+                texts.extend(item_texts)
+                self.queue_wait_ms.observe((started - enqueued) * 1000)
+            self.batch_size.observe(len(texts))
+
+            try:
+                if self.run_in_executor is not None:
+                    vectors = await self.run_in_executor(self.encode_fn, texts)
+                else:
+                    vectors = await asyncio.get_running_loop().run_in_executor(
+                        None, self.encode_fn, texts
+                    )
+            except Exception as e:
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, future, _ in items:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+        }
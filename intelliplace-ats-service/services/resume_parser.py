@@ -1,13 +1,22 @@
 """
 Resume parser - extracts skills, experience, education, projects from resume text.
-Uses regex patterns; spaCy optional for enhanced extraction.
+Skills, degrees and internships come from a single-pass taxonomy scan
+(see skill_extractor); experience and projects use precompiled regexes.
 """
 import re
 
+from services.skill_extractor import SkillExtractor
+
+# Compiled once at import; the parser runs them on every resume.
+EXPERIENCE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*[+]?\s*(?:years?|yrs?|yoe)')
+EXPERIENCE_LABEL_RE = re.compile(r'experience[:\s]+(\d+)')
+PROJECT_RE = re.compile(r'\b(?:project|developed|built)\b.*?(?:\d+|one|two|three)')
+NUMBERED_PROJECT_RE = re.compile(r'project\s*[#:]?\s*\d+')
+
 
 class ResumeParser:
-    def __init__(self):
-        pass
+    def __init__(self, skill_extractor=None):
+        self.skill_extractor = skill_extractor or SkillExtractor.default()
 
     def parse(self, resume_text: str) -> dict:
         """Parse resume text and extract structured data."""
@@ -21,48 +30,39 @@ class ResumeParser:
             "raw_text": resume_text[:500] if resume_text else ""
         }
 
-        # Extract skills via common patterns
-        skill_patterns = [
-            r'\b(python|java|javascript|react|node\.?js|c\+\+|sql|mongodb|aws|docker|git|machine learning|ml|data science)\b',
-            r'\b(html|css|typescript|angular|vue|express|django|flask|fastapi)\b',
-            r'\b(communication|leadership|teamwork|problem solving|analytical)\b',
-        ]
-        seen = set()
-        for pat in skill_patterns:
-            for m in re.finditer(pat, text, re.I):
-                s = m.group(1).strip()
-                if s not in seen:
-                    seen.add(s)
-                    result["skills"].append(s)
+        # Skills, degree and internship mentions in one scan
+        entities = self.skill_extractor.extract(text)
+        result["skills"] = entities["skills"]
+        result["education_degree"] = entities["education_degree"]
+        result["internship_count"] = min(entities["internship_count"], 5)
 
         # Experience years - look for "X years", "X+ years", "X yoe"
-        exp_match = re.search(r'(\d+(?:\.\d+)?)\s*[+]?\s*(?:years?|yrs?|yoe)', text, re.I)
+        exp_match = EXPERIENCE_RE.search(text)
         if exp_match:
             result["experience_years"] = float(exp_match.group(1))
         else:
-            exp_match = re.search(r'experience[:\s]+(\d+)', text, re.I)
+            exp_match = EXPERIENCE_LABEL_RE.search(text)
             if exp_match:
                 result["experience_years"] = float(exp_match.group(1))
 
         # Project count
-        proj_matches = re.findall(r'\b(?:project|developed|built)\b.*?(?:\d+|one|two|three)', text, re.I)
-        result["project_count"] = min(len(proj_matches) + len(re.findall(r'project\s*[#:]?\s*\d+', text, re.I)), 10)
+        proj_matches = PROJECT_RE.findall(text)
+        result["project_count"] = min(len(proj_matches) + len(NUMBERED_PROJECT_RE.findall(text)), 10)
 
-        # Internship count
-        intern_matches = re.findall(r'\bintern(?:ship)?\b', text, re.I)
-        result["internship_count"] = min(len(intern_matches), 5)
+        return result
 
-        # Education degree
-        degree_patterns = [
-            (r'phd|doctorate', 'phd'),
-            (r'm\.?tech|mtech|m\.?s\.?|ms|masters?', 'masters'),
-            (r'b\.?tech|btech|b\.?e\.?|be|bachelor|b\.?s\.?|bs', 'bachelor'),
-            (r'bca', 'bca'),
-            (r'mca', 'mca'),
-        ]
-        for pat, label in degree_patterns:
-            if re.search(rf'\b{pat}\b', text):
-                result["education_degree"] = label
-                break
 
-        return result
+_worker_parser = None
+
+
+def parse_resumes(resume_texts: list) -> list:
+    """
+    Parse a list of resumes.
+
+    Module-level so it can be shipped to a process pool; each worker process
+    keeps its own ResumeParser.
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParser()
+    return [_worker_parser.parse(text) for text in resume_texts]
@@ -2,6 +2,7 @@
 Scoring engine for resume evaluation.
 Calculates normalized feature scores and weighted final score.
 """
+from services.skill_extractor import SkillExtractor
 
 
 class ScoringEngine:
@@ -14,12 +15,18 @@ class ScoringEngine:
         "education_match_score": 0.10,
     }
 
+    def __init__(self, skill_extractor: SkillExtractor = None):
+        self.skill_extractor = skill_extractor or SkillExtractor.default()
+
     def calculate_skill_match(self, resume_skills: list, required_skills: list) -> float:
         """Skill match ratio (0-1)."""
         if not required_skills:
             return 0.8
-        req = set(s.lower().strip() for s in required_skills if s)
-        res = set(s.lower().strip() for s in resume_skills if s)
+        # Resume skills are already canonical; map requirements the same way
+        # so "K8s" in a job spec matches "kubernetes" from a resume.
+        canonical = self.skill_extractor.canonical
+        req = set(canonical(s) for s in required_skills if s and s.strip())
+        res = set(canonical(s) for s in resume_skills if s and s.strip())
         if not req:
             return 0.8
         # Partial match (substring)
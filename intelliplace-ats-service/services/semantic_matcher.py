@@ -2,72 +2,330 @@
 Semantic similarity between resume and job description.
 Uses sentence-transformers for embeddings, falls back to TF-IDF if unavailable.
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import asyncio
+import logging
+import os
+import threading
+
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache, normalize_text
+from services.micro_batcher import MicroBatcher
+from services.tfidf_fallback import TfidfFallback
+from services.worker_pool import QueueFullError
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotReadyError(Exception):
+    """Raised when an operation needs real embeddings but the model is not loaded."""
 
 
 class SemanticMatcher:
-    def __init__(self):
+    def __init__(self, run_in_executor=None):
+        """
+        run_in_executor: optional coroutine function `run(fn, *args)` used by
+            the async API to call blocking code off the event loop.
+        """
         self._model = None
+        self._load_lock = threading.Lock()
+        self._stop_loading = threading.Event()
+        # pending -> loading -> ready | failed
+        self.model_state = "pending"
+        self.load_attempts = 0
+        self.load_error = None
+        self.run_in_executor = run_in_executor
+        self.cache = EmbeddingCache(
+            MODEL_NAME,
+            max_entries=int(os.getenv('ATS_EMBEDDING_CACHE_SIZE', '20000')),
+            disk_dir=os.getenv('ATS_EMBEDDING_CACHE_DIR') or None,
+            disk_capacity=int(os.getenv('ATS_EMBEDDING_CACHE_DISK_ROWS', '200000'))
+        )
+        self.tfidf = TfidfFallback(os.getenv('ATS_TFIDF_MODEL_PATH') or None)
+        self.batcher = MicroBatcher(
+            self._encode_uncached,
+            run_in_executor=run_in_executor,
+            max_batch_size=int(os.getenv('ATS_BATCH_MAX_SIZE', '64')),
+            max_wait_ms=float(os.getenv('ATS_BATCH_MAX_WAIT_MS', '5'))
+        )
 
     def _get_model(self):
-        if self._model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self._model = SentenceTransformer('all-MiniLM-L6-v2')
-            except Exception:
-                self._model = None
+        """
+        The loaded model, or None while it is loading or after loading failed
+        (callers then use the TF-IDF / keyword fallbacks).
+
+        If nothing has started loading the model (e.g. the matcher is used
+        outside the service lifecycle), load it here once.
+        """
+        if self.model_state == "pending":
+            self.load_model(max_attempts=1)
         return self._model
 
-    def compute_similarity(
+    def load_model(self, max_attempts: int = 5, initial_backoff: float = 1.0, max_backoff: float = 60.0) -> bool:
+        """
+        Load and warm up the sentence-transformer, retrying with exponential backoff.
+
+        Blocking; the service calls it from a background thread at startup.
+        Returns True once the model is ready, False when the attempts run out
+        or stop_loading() is called.
+        """
+        with self._load_lock:
+            if self.model_state == "ready":
+                return True
+            self.model_state = "loading"
+            backoff = initial_backoff
+            while not self._stop_loading.is_set():
+                self.load_attempts += 1
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(MODEL_NAME)
+                    # Warm-up: the first encode pays for lazy kernel/tokenizer init
+                    model.encode(["warm up"], convert_to_numpy=True)
+                    self._model = model
+                    self.model_state = "ready"
+                    self.load_error = None
+                    return True
+                except Exception as e:
+                    self.load_error = str(e)
+                    logger.warning(
+                        "Loading %s failed (attempt %d): %s", MODEL_NAME, self.load_attempts, e
+                    )
+                if max_attempts and self.load_attempts >= max_attempts:
+                    break
+                self._stop_loading.wait(backoff)
+                backoff = min(backoff * 2, max_backoff)
+            self.model_state = "failed"
+            return False
+
+    def stop_loading(self):
+        """Make a running load_model() give up after its current attempt."""
+        self._stop_loading.set()
+
+    def status(self) -> dict:
+        return {
+            "model": MODEL_NAME,
+            "state": self.model_state,
+            "load_attempts": self.load_attempts,
+            "error": self.load_error,
+        }
+
+    async def _run(self, fn, *args):
+        if self.run_in_executor is not None:
+            return await self.run_in_executor(fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _encode_uncached(self, texts: list) -> np.ndarray:
+        """Run the transformer on `texts` and return L2-normalized rows."""
+        emb = np.asarray(
+            self._model.encode(texts, batch_size=64, convert_to_numpy=True),
+            dtype=np.float32
+        )
+        emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+        return emb
+
+    def _lookup(self, texts: list):
+        """
+        Split `texts` into cached vectors and texts still to encode.
+
+        Returns (vectors, pending) where vectors has None for each miss and
+        pending maps each distinct missing text to its positions.
+        """
+        texts = [normalize_text(t) for t in texts]
+        vectors = self.cache.get_many([self.cache.make_key(t) for t in texts])
+        pending = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                pending.setdefault(texts[i], []).append(i)
+        return vectors, pending
+
+    def _fill(self, vectors: list, pending: dict, emb: np.ndarray) -> np.ndarray:
+        missing = list(pending)
+        self.cache.put_many([self.cache.make_key(t) for t in missing], emb)
+        for text, vector in zip(missing, emb):
+            for i in pending[text]:
+                vectors[i] = vector
+        return np.vstack(vectors)
+
+    def _encode(self, texts: list) -> np.ndarray:
+        """
+        L2-normalized embeddings for `texts`, one row per text.
+
+        Vectors already in the cache skip the transformer entirely; the
+        remaining (deduplicated) texts are encoded in a single batch.
+        """
+        vectors, pending = self._lookup(texts)
+        if not pending:
+            return np.vstack(vectors)
+        return self._fill(vectors, pending, self._encode_uncached(list(pending)))
+
+    async def aencode(self, texts: list) -> np.ndarray:
+        """Async `_encode`: cache misses are coalesced with other callers' into one batch."""
+        # The disk tier reads and flushes a memory-mapped file under the cache
+        # lock, so with it enabled cache access stays off the event loop
+        offload = self.cache.has_disk_tier
+        vectors, pending = await self._run(self._lookup, texts) if offload else self._lookup(texts)
+        if not pending:
+            return np.vstack(vectors)
+        emb = await self.batcher.submit(list(pending))
+        if offload:
+            return await self._run(self._fill, vectors, pending, emb)
+        return self._fill(vectors, pending, emb)
+
+    async def embed_resumes(self, resume_texts: list) -> np.ndarray:
+        """Unit-length resume embeddings as used by compute_similarities (for indexing)."""
+        if self._model is None:
+            raise ModelNotReadyError(f"{MODEL_NAME} is {self.model_state}")
+        return await self.aencode([(r or "").strip()[:4000] for r in resume_texts])
+
+    async def embed_job(self, job_description: str, job_description_pdf_text=None) -> np.ndarray:
+        """Unit-length job embedding as used by compute_similarities (for retrieval)."""
+        if self._model is None:
+            raise ModelNotReadyError(f"{MODEL_NAME} is {self.model_state}")
+        return (await self.aencode([self._job_text(job_description, job_description_pdf_text)]))[0]
+
+    @staticmethod
+    def _job_text(job_description: str, job_description_pdf_text=None) -> str:
+        job = (job_description or "").strip()
+        if job_description_pdf_text:
+            job += " " + (job_description_pdf_text or "").strip()
+        return job[:4000] or "job"
+
+    @staticmethod
+    def _to_score(sim) -> float:
+        """Map cosine similarity (-1..1) to 0-1."""
+        return float(max(0, min(1, (sim + 1) / 2)))
+
+    def compute_similarities(
         self,
         resume_text: str,
+        job_title: str,
         job_description: str,
         job_description_pdf_text=None
-    ) -> float:
-        """Compute semantic similarity between resume and job description (0-1)."""
+    ) -> tuple:
+        """
+        Semantic (resume vs job text) and role (resume vs title) similarity, 0-1 each.
+
+        Resume, job text and title are encoded together in one batch and each
+        vector is normalized once, so the resume is embedded a single time per
+        evaluation and both scores are dot products.
+        """
         resume = (resume_text or "").strip()[:4000]
-        job = (job_description or "").strip()
-        if job_description_pdf_text:
-            job += " " + (job_description_pdf_text or "").strip()
-        job = job[:4000] or "job"
+        job = self._job_text(job_description, job_description_pdf_text)
+        title = (job_title or "").strip().lower()
 
         model = self._get_model()
         if model is not None:
             try:
-                emb = model.encode([resume, job])
-                sim = cosine_similarity([emb[0]], [emb[1]])[0][0]
-                return float(max(0, min(1, (sim + 1) / 2)))
+                return self._similarities_from(self._encode([resume, job, title or "job"]), title)
             except Exception:
                 pass
 
-        # Fallback: TF-IDF cosine similarity
-        vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
-        try:
-            matrix = vectorizer.fit_transform([resume, job])
-            sim = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
-            return float(max(0, min(1, sim)))
-        except Exception:
-            return 0.5
-
-    def compute_role_similarity(self, resume_text: str, job_title: str) -> float:
-        """Compute similarity between resume and job title/role (0-1)."""
-        resume = (resume_text or "").strip().lower()[:2000]
-        title = (job_title or "").strip().lower()
-        if not title:
-            return 0.7
+        return self._fallback_similarities(resume, job, title)
 
-        model = self._get_model()
-        if model is not None:
+    async def compute_similarities_async(
+        self,
+        resume_text: str,
+        job_title: str,
+        job_description: str,
+        job_description_pdf_text=None
+    ) -> tuple:
+        """`compute_similarities` for the event loop, using micro-batched encoding."""
+        resume = (resume_text or "").strip()[:4000]
+        job = self._job_text(job_description, job_description_pdf_text)
+        title = (job_title or "").strip().lower()
+        if self._model is not None:
             try:
-                emb = model.encode([resume, title])
-                sim = cosine_similarity([emb[0]], [emb[1]])[0][0]
-                return float(max(0, min(1, (sim + 1) / 2)))
+                return self._similarities_from(await self.aencode([resume, job, title or "job"]), title)
+            except QueueFullError:
+                raise
             except Exception:
                 pass
+        # Model still loading (or unavailable): fallbacks, off-loop
+        return await self._run(self._fallback_similarities, resume, job, title)
+
+    async def similarities_from_embeddings(
+        self,
+        resume_vectors: np.ndarray,
+        job_vector: np.ndarray,
+        job_title: str
+    ) -> list:
+        """
+        `compute_batch_similarities` for resumes and a job already embedded
+        (e.g. taken from the vector indexes): only the title is encoded.
+        """
+        if self._model is None:
+            raise ModelNotReadyError(f"{MODEL_NAME} is {self.model_state}")
+        if len(resume_vectors) == 0:
+            return []
+        title = (job_title or "").strip().lower()
+        semantic = np.clip((resume_vectors @ job_vector + 1) / 2, 0, 1)
+        if title:
+            title_vector = (await self.aencode([title]))[0]
+            role = np.clip((resume_vectors @ title_vector + 1) / 2, 0, 1)
+        else:
+            role = np.full(len(resume_vectors), 0.7)
+        return [(float(s), float(r)) for s, r in zip(semantic, role)]
+
+    def _similarities_from(self, emb: np.ndarray, title: str) -> tuple:
+        """(semantic, role) from unit rows [resume, job, title]."""
+        semantic = self._to_score(emb[0] @ emb[1])
+        role = self._to_score(emb[0] @ emb[2]) if title else 0.7
+        return semantic, role
 
-        # Fallback: keyword overlap
+    def _fallback_similarities(self, resume: str, job: str, title: str) -> tuple:
+        semantic = self._tfidf_similarity(resume, job)
+        role = self._keyword_role_similarity(resume.lower()[:2000], title) if title else 0.7
+        return semantic, role
+
+    def _tfidf_similarity(self, resume: str, job: str) -> float:
+        """Fallback: TF-IDF cosine similarity."""
+        return self.tfidf.similarity(resume, job)
+
+    @staticmethod
+    def _keyword_role_similarity(resume: str, title: str) -> float:
+        """Fallback: keyword overlap."""
         title_words = set(w for w in title.split() if len(w) > 2)
         resume_words = set(resume.split())
         overlap = len(title_words & resume_words) / max(len(title_words), 1)
         return float(max(0, min(1, overlap * 2)))
+
+    def compute_batch_similarities(
+        self,
+        resume_texts: list,
+        job_title: str,
+        job_description: str,
+        job_description_pdf_text=None
+    ) -> list:
+        """
+        Score many resumes against one job.
+
+        The job text and title are embedded once, all resumes go through a
+        single batched encode call (one vector per resume, shared by both
+        scores) and similarities are computed as matrix products. Returns
+        (semantic_similarity, role_similarity) per resume, in input order.
+        """
+        resumes = [(r or "").strip()[:4000] for r in resume_texts]
+        job = self._job_text(job_description, job_description_pdf_text)
+        title = (job_title or "").strip().lower()
+
+        if not resumes:
+            return []
+
+        model = self._get_model()
+        if model is not None:
+            try:
+                n = len(resumes)
+                emb = self._encode([job, title or "job"] + resumes)
+                semantic = np.clip((emb[2:] @ emb[0] + 1) / 2, 0, 1)
+                if title:
+                    role = np.clip((emb[2:] @ emb[1] + 1) / 2, 0, 1)
+                else:
+                    role = np.full(n, 0.7)
+                return [(float(s), float(r)) for s, r in zip(semantic, role)]
+            except Exception:
+                pass
+
+        # Fallback: per-resume TF-IDF / keyword overlap
+        return [self._fallback_similarities(resume, job, title) for resume in resumes]
@@ -0,0 +1,148 @@
+"""
+Single-pass entity extraction for resumes.
+Skills (from a configurable taxonomy with aliases), degrees and internship
+mentions are compiled once into one trie-shaped regex, so a resume is scanned
+a single time regardless of taxonomy size.
+"""
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills_taxonomy.json"
+)
+
+# Highest priority first: the best degree mentioned anywhere wins.
+DEGREES = [
+    ("phd", ["phd", "doctorate"]),
+    ("masters", ["m.tech", "mtech", "m.s.", "m.s", "ms.", "ms", "master", "masters"]),
+    ("bachelor", ["b.tech", "btech", "b.e.", "b.e", "be.", "be", "bachelor", "b.s.", "b.s", "bs.", "bs"]),
+    ("bca", ["bca"]),
+    ("mca", ["mca"]),
+]
+
+INTERNSHIP_TERMS = ["intern", "internship"]
+
+SKILL, DEGREE, INTERNSHIP = "skill", "degree", "internship"
+
+
+def load_taxonomy(path: str) -> dict:
+    """
+    Load a skills taxonomy file and return {alias: canonical_name}.
+
+    The file maps categories to {canonical_name: [aliases]}; the canonical
+    name is always matched as well.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    aliases = {}
+    for skills in data.get("skills", {}).values():
+        for name, names in skills.items():
+            canonical = name.strip().lower()
+            for alias in [name] + list(names):
+                alias = alias.strip().lower()
+                if alias:
+                    aliases.setdefault(alias, canonical)
+    return aliases
+
+
+def build_trie_pattern(terms) -> str:
+    """
+    Build a regex matching any of `terms`, factored as a prefix trie.
+
+    Alternatives share prefixes, so the pattern grows linearly with the total
+    term length and the engine never retries a prefix it has already matched.
+    Optional suffixes are greedy, which makes the longest term win. A space in
+    a term matches any run of whitespace.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = None
+
+    def build(node) -> str:
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted((k, v) for k, v in node.items() if k)
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillExtractor:
+    _default = None
+
+    def __init__(self, skill_aliases: dict):
+        """skill_aliases: {alias: canonical_name}, all lowercase."""
+        self._lookup = {}
+        for alias, canonical in skill_aliases.items():
+            self._lookup[alias] = (SKILL, canonical)
+        # Degree and internship terms take precedence over same-spelled skills
+        for label, terms in DEGREES:
+            for term in terms:
+                self._lookup[term] = (DEGREE, label)
+        for term in INTERNSHIP_TERMS:
+            self._lookup[term] = (INTERNSHIP, term)
+        self._degree_rank = {label: rank for rank, (label, _) in enumerate(DEGREES)}
+        self._pattern = re.compile(
+            r"(?<!\w)(?:" + build_trie_pattern(self._lookup) + r")(?!\w)"
+        )
+
+    @classmethod
+    def from_taxonomy(cls, path: str) -> "SkillExtractor":
+        return cls(load_taxonomy(path))
+
+    @classmethod
+    def default(cls) -> "SkillExtractor":
+        """Process-wide extractor for ATS_SKILLS_TAXONOMY (or the bundled taxonomy), compiled once."""
+        if cls._default is None:
+            cls._default = cls.from_taxonomy(
+                os.getenv("ATS_SKILLS_TAXONOMY") or DEFAULT_TAXONOMY_PATH
+            )
+        return cls._default
+
+    @property
+    def size(self) -> int:
+        return len(self._lookup)
+
+    def canonical(self, skill: str) -> str:
+        """Canonical name for a skill or alias ("K8s" -> "kubernetes"); unknown skills are just normalised."""
+        key = " ".join(skill.lower().split())
+        kind, label = self._lookup.get(key, (None, None))
+        return label if kind == SKILL else key
+
+    def extract(self, text: str) -> dict:
+        """
+        Scan lowercased `text` once.
+
+        Returns skills (canonical names in order of first mention), the
+        highest-ranked degree label ("" if none) and the internship mention count.
+        """
+        skills = []
+        seen = set()
+        degree = ""
+        internships = 0
+        for match in self._pattern.finditer(text):
+            kind, label = self._lookup[" ".join(match.group(0).split())]
+            if kind == SKILL:
+                if label not in seen:
+                    seen.add(label)
+                    skills.append(label)
+            elif kind == DEGREE:
+                if not degree or self._degree_rank[label] < self._degree_rank[degree]:
+                    degree = label
+            else:
+                internships += 1
+        return {
+            "skills": skills,
+            "education_degree": degree,
+            "internship_count": internships,
+        }
@@ -0,0 +1,113 @@
+"""
+TF-IDF similarity used when the sentence-transformer is unavailable.
+A vectorizer fitted once on historical resumes and job descriptions is loaded
+from disk; requests only call `transform`, and job vectors are cached per job.
+Without a fitted vectorizer it falls back to fitting on the resume/job pair.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tfidf_vectorizer.joblib"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TfidfFallback:
+    def __init__(self, model_path: str = None, job_cache_size: int = 1024):
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.job_cache_size = job_cache_size
+        self._vectorizer = None
+        self._job_vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def fitted(self) -> bool:
+        return self._vectorizer is not None
+
+    def load(self) -> bool:
+        """Load the persisted vectorizer if present; returns True on success."""
+        if not os.path.exists(self.model_path):
+            return False
+        try:
+            import joblib
+            self._vectorizer = joblib.load(self.model_path)
+            with self._lock:
+                self._job_vectors.clear()
+            return True
+        except Exception as e:
+            logger.warning("Could not load TF-IDF vectorizer from %s: %s", self.model_path, e)
+            return False
+
+    def fit(self, corpus: list, max_features: int = 50000) -> None:
+        """Fit on historical resumes and job descriptions."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(
+            max_features=max_features,
+            stop_words='english',
+            sublinear_tf=True,
+            min_df=2,
+            dtype=np.float32
+        )
+        vectorizer.fit(corpus)
+        self._vectorizer = vectorizer
+        with self._lock:
+            self._job_vectors.clear()
+
+    def save(self, path: str = None) -> str:
+        import joblib
+
+        path = path or self.model_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump(self._vectorizer, path)
+        return path
+
+    def _job_vector(self, job: str):
+        key = hashlib.sha256(job.encode("utf-8")).hexdigest()
+        with self._lock:
+            vector = self._job_vectors.get(key)
+            if vector is not None:
+                self._job_vectors.move_to_end(key)
+                return vector
+        vector = self._vectorizer.transform([job])
+        with self._lock:
+            self._job_vectors[key] = vector
+            while len(self._job_vectors) > self.job_cache_size:
+                self._job_vectors.popitem(last=False)
+        return vector
+
+    def similarity(self, resume: str, job: str) -> float:
+        """TF-IDF cosine similarity (0-1)."""
+        try:
+            if self._vectorizer is not None:
+                # Rows are L2-normalized, so the dot product is the cosine
+                sim = (self._vectorizer.transform([resume]) @ self._job_vector(job).T).toarray()[0][0]
+            else:
+                sim = self._pairwise_similarity(resume, job)
+            return float(max(0, min(1, sim)))
+        except Exception:
+            return 0.5
+
+    @staticmethod
+    def _pairwise_similarity(resume: str, job: str) -> float:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+        matrix = vectorizer.fit_transform([resume, job])
+        return cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
+
+    def stats(self) -> dict:
+        return {
+            "fitted": self.fitted,
+            "model_path": self.model_path,
+            "vocabulary_size": len(self._vectorizer.vocabulary_) if self.fitted else 0,
+            "cached_job_vectors": len(self._job_vectors),
+        }
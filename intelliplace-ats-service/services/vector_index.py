@@ -0,0 +1,521 @@
+"""
+Persistent nearest-neighbour index over unit-length embeddings.
+Exact brute-force search with NumPy for small pools; above a size threshold an
+IVF (inverted file) index is built locally with spherical k-means and only the
+closest clusters are scanned.
+
+Persistence is append-only: each save appends the vectors, documents and log
+records of the items changed since the previous one. Documents (e.g. resume
+text) stay on disk and are read back on demand. Once superseded records
+outnumber live ones, the files are compacted into a new generation.
+"""
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+
+def _spherical_kmeans(data: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty clusters from random points
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        directory: str = None,
+        ivf_threshold: int = 20000,
+        n_probe: int = 8,
+        probe_fraction: float = 0.15,
+        kmeans_sample: int = 50000
+    ):
+        """
+        directory: where the index is persisted (None keeps it in memory only).
+        ivf_threshold: pool size from which approximate IVF search is used.
+        n_probe: minimum clusters scanned per IVF query.
+        probe_fraction: share of the clusters scanned per IVF query; the list
+            count grows with the pool, so a fixed probe count loses recall.
+        """
+        self.directory = directory
+        self.ivf_threshold = ivf_threshold
+        self.n_probe = n_probe
+        self.probe_fraction = probe_fraction
+        self.kmeans_sample = kmeans_sample
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._ids = []
+        self._rows = {}
+        self._metadata = {}
+        self._matrix = None
+        # Documents not yet written (all of them when not persistent), and
+        # (offset, length) in the documents file for the written ones
+        self._documents = {}
+        self._document_refs = {}
+        # item_id -> True (upserted) / False (removed) since the last save
+        self._unsaved = {}
+        self._generation = 0
+        self._records = 0
+        self._vector_rows = 0
+        self._document_bytes = 0
+        # IVF state
+        self._centroids = None
+        self._assign = None
+        self._lists = None
+        self._built_at_size = 0
+        # Rows touched while a rebuild is clustering outside the lock
+        self._building = False
+        self._changed_rows = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return str(item_id) in self._rows
+
+    @property
+    def mode(self) -> str:
+        return "ivf" if self._centroids is not None else "exact"
+
+    @property
+    def probes(self) -> int:
+        """Clusters scanned per IVF query at the current list count."""
+        n_lists = len(self._lists) if self._lists is not None else 0
+        return min(n_lists, max(self.n_probe, math.ceil(self.probe_fraction * n_lists)))
+
+    def get_metadata(self, item_id):
+        return self._metadata.get(str(item_id))
+
+    def get_vector(self, item_id):
+        with self._lock:
+            row = self._rows.get(str(item_id))
+            return None if row is None else self._matrix[row].copy()
+
+    def get_vectors(self, item_ids) -> np.ndarray:
+        """Stacked vectors of `item_ids`, which must all be indexed."""
+        with self._lock:
+            if self._matrix is None:
+                return np.zeros((0, 0), dtype=np.float32)
+            return self._matrix[[self._rows[str(i)] for i in item_ids]]
+
+    def get_documents(self, item_ids) -> list:
+        """Document of each item in `item_ids`, None where there is none."""
+        with self._lock:
+            documents = [self._documents.get(str(i)) for i in item_ids]
+            wanted = [
+                (position, self._document_refs[str(i)])
+                for position, i in enumerate(item_ids)
+                if documents[position] is None and str(i) in self._document_refs
+            ]
+            # Read under the lock: compaction replaces the file
+            for position, text in self._read_documents(self._generation, wanted):
+                documents[position] = text
+        return documents
+
+    def upsert(self, item_id, vector, metadata: dict = None, document: str = None) -> None:
+        """
+        Add or replace an item. metadata (small, kept in memory) and document
+        (large, read back with get_documents) are left unchanged when None.
+        """
+        item_id = str(item_id)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self._ids)
+                self._grow(row + 1, len(vector))
+                self._ids.append(item_id)
+                self._rows[item_id] = row
+            elif self._lists is not None:
+                self._lists[self._assign[row]].discard(row)
+            self._matrix[row] = vector
+            if self._changed_rows is not None:
+                self._changed_rows.add(row)
+            if metadata is not None:
+                self._metadata[item_id] = metadata
+            if document is not None:
+                self._documents[item_id] = document
+                self._document_refs.pop(item_id, None)
+            if self._lists is not None:
+                cluster = int(np.argmax(self._centroids @ vector))
+                self._assign[row] = cluster
+                self._lists[cluster].add(row)
+            self._unsaved[item_id] = True
+            self.maybe_build_ivf()
+
+    def remove(self, item_id) -> bool:
+        item_id = str(item_id)
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return False
+            self._metadata.pop(item_id, None)
+            self._documents.pop(item_id, None)
+            self._document_refs.pop(item_id, None)
+            self._unsaved[item_id] = False
+            last = len(self._ids) - 1
+            if self._lists is not None:
+                self._lists[self._assign[row]].discard(row)
+            if row != last:
+                # Move the last row into the freed slot
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                if self._changed_rows is not None:
+                    self._changed_rows.add(row)
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+                if self._lists is not None:
+                    cluster = self._assign[last]
+                    self._lists[cluster].discard(last)
+                    self._lists[cluster].add(row)
+                    self._assign[row] = cluster
+            self._ids.pop()
+            if len(self._ids) < self.ivf_threshold // 2:
+                self._drop_ivf()
+            return True
+
+    def search(self, query, k: int = 10) -> list:
+        """Top-k (id, cosine similarity) pairs for a unit-length query."""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            rows = None
+            if self._lists is not None:
+                probes = np.argsort(-(self._centroids @ query))[:self.probes]
+                rows = np.fromiter(
+                    (r for c in probes for r in self._lists[c]), dtype=np.int64
+                )
+                if len(rows) < k:
+                    rows = None
+            # Exact search scores a view of the live rows, no copy
+            scores = (self._matrix[:n] if rows is None else self._matrix[rows]) @ query
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            if rows is not None:
+                return [(self._ids[rows[i]], float(scores[i])) for i in top]
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+    def search_many(self, queries, k: int = 10) -> list:
+        return [self.search(q, k) for q in queries]
+
+    def _grow(self, size: int, dim: int) -> None:
+        if self._matrix is None:
+            self._matrix = np.zeros((max(1024, size), dim), dtype=np.float32)
+        elif size > len(self._matrix):
+            grown = np.zeros((max(size, 2 * len(self._matrix)), dim), dtype=np.float32)
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+        if self._assign is not None and size > len(self._assign):
+            grown = np.zeros(len(self._matrix), dtype=np.int64)
+            grown[:len(self._assign)] = self._assign
+            self._assign = grown
+
+    def maybe_build_ivf(self) -> None:
+        """
+        Rebuild the IVF index in a background thread when first crossing the
+        threshold and whenever the pool doubles; searches keep using the
+        current structures until the new ones are swapped in.
+        """
+        with self._lock:
+            n = len(self._ids)
+            if self._building or n < self.ivf_threshold:
+                return
+            if self._centroids is not None and n < 2 * self._built_at_size:
+                return
+            self._building = True
+        threading.Thread(target=self.build_ivf, name="ivf-build", daemon=True).start()
+
+    def build_ivf(self) -> None:
+        """
+        (Re)cluster the pool. K-means runs outside the lock on the rows present
+        at the start; rows changed meanwhile are re-assigned when the new
+        structures are swapped in.
+        """
+        with self._lock:
+            self._building = True
+            self._changed_rows = set()
+            n = len(self._ids)
+            matrix = self._matrix
+        try:
+            if n == 0:
+                return
+            data = matrix[:n]
+            n_lists = max(1, min(n, int(4 * np.sqrt(n))))
+            sample = data
+            if n > self.kmeans_sample:
+                sample = data[np.random.default_rng(0).choice(n, self.kmeans_sample, replace=False)]
+            centroids = _spherical_kmeans(sample, n_lists)
+            assign = np.argmax(data @ centroids.T, axis=1)
+
+            with self._lock:
+                size = len(self._ids)
+                if size < self.ivf_threshold // 2:
+                    return
+                changed = [row for row in self._changed_rows if row < size]
+                changed = np.array(sorted(set(changed) | set(range(n, size))), dtype=np.int64)
+                full = np.zeros(len(self._matrix), dtype=np.int64)
+                kept = min(n, size)
+                full[:kept] = assign[:kept]
+                if len(changed):
+                    full[changed] = np.argmax(self._matrix[changed] @ centroids.T, axis=1)
+                lists = [set() for _ in range(n_lists)]
+                for row, cluster in enumerate(full[:size].tolist()):
+                    lists[cluster].add(row)
+                self._centroids = centroids
+                self._assign = full
+                self._lists = lists
+                self._built_at_size = size
+        finally:
+            with self._lock:
+                self._building = False
+                self._changed_rows = None
+
+    def _drop_ivf(self) -> None:
+        self._centroids = None
+        self._assign = None
+        self._lists = None
+        self._built_at_size = 0
+
+    # Persistence
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _files(self, generation: int) -> tuple:
+        return tuple(
+            self._path(f"{name}.{generation}.{ext}")
+            for name, ext in (("vectors", "f32"), ("documents", "txt"), ("log", "jsonl"))
+        )
+
+    def save(self) -> bool:
+        """Append the items changed since the last save; compacts when mostly superseded."""
+        if not self.directory:
+            return False
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return False
+                if self._records >= 2 * len(self._ids) + 1000:
+                    compact = True
+                else:
+                    compact = False
+                    batch = []
+                    for item_id, present in self._unsaved.items():
+                        row = self._rows.get(item_id) if present else None
+                        if row is None:
+                            batch.append((item_id, None, None, None, None))
+                        else:
+                            batch.append((
+                                item_id, self._matrix[row].copy(), self._metadata.get(item_id),
+                                self._documents.get(item_id), self._document_refs.get(item_id)
+                            ))
+                    unsaved, self._unsaved = self._unsaved, {}
+                generation = self._generation
+                vector_rows, document_bytes = self._vector_rows, self._document_bytes
+                dim = self._matrix.shape[1] if self._matrix is not None else 0
+            if compact:
+                return self._compact(generation, dim)
+            try:
+                if not os.path.exists(self._path("meta.json")):
+                    self._write_meta(generation, dim)
+                written = self._append(generation, batch, vector_rows, document_bytes)
+            except Exception:
+                with self._lock:
+                    # Saved again next time, unless changed meanwhile
+                    for item_id, present in unsaved.items():
+                        self._unsaved.setdefault(item_id, present)
+                raise
+            with self._lock:
+                for item_id, document, ref in written:
+                    if self._documents.get(item_id) is document:
+                        del self._documents[item_id]
+                        self._document_refs[item_id] = ref
+                self._records += len(batch)
+                self._vector_rows += sum(1 for item in batch if item[1] is not None)
+                self._document_bytes += sum(ref[1] for _, _, ref in written)
+            return True
+
+    def _append(self, generation: int, batch: list, vector_rows: int, document_bytes: int) -> list:
+        """
+        Append `batch` to the files of `generation`; returns (item_id,
+        document, ref) for each document written. Vectors and documents are
+        flushed before the log lines that point at them, so a torn write
+        leaves only unreferenced bytes behind.
+        """
+        vectors_path, documents_path, log_path = self._files(generation)
+        lines, written = [], []
+        with open(vectors_path, "ab") as vectors, open(documents_path, "ab") as documents:
+            for item_id, vector, metadata, document, ref in batch:
+                if vector is None:
+                    lines.append({"id": item_id, "removed": True})
+                    continue
+                vectors.write(vector.tobytes())
+                if document is not None:
+                    data = document.encode("utf-8")
+                    ref = (document_bytes, len(data))
+                    documents.write(data)
+                    document_bytes += len(data)
+                    written.append((item_id, document, ref))
+                lines.append({"id": item_id, "vector": vector_rows, "document": ref, "metadata": metadata})
+                vector_rows += 1
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.writelines(json.dumps(line) + "\n" for line in lines)
+        return written
+
+    def _compact(self, generation: int, dim: int) -> bool:
+        """
+        Rewrite the live items into the next generation and switch to it.
+        Runs under the save lock only; items changed meanwhile stay unsaved
+        and are appended to the new generation by the next save.
+        """
+        with self._lock:
+            ids = list(self._ids)
+            matrix = self._matrix[:len(ids)].copy()
+            metadata = dict(self._metadata)
+            pending = dict(self._documents)
+            refs = dict(self._document_refs)
+            unsaved, self._unsaved = self._unsaved, {}
+        documents = [pending.get(item_id) for item_id in ids]
+        wanted = [
+            (row, refs[item_id]) for row, item_id in enumerate(ids)
+            if documents[row] is None and item_id in refs
+        ]
+        for row, text in self._read_documents(generation, wanted):
+            documents[row] = text
+        batch = [
+            (item_id, matrix[row], metadata.get(item_id), documents[row], None)
+            for row, item_id in enumerate(ids)
+        ]
+        target = generation + 1
+        try:
+            for path in self._files(target):
+                if os.path.exists(path):
+                    os.remove(path)
+            written = self._append(target, batch, 0, 0)
+            self._write_meta(target, dim)
+        except Exception:
+            with self._lock:
+                for item_id, present in unsaved.items():
+                    self._unsaved.setdefault(item_id, present)
+            raise
+        with self._lock:
+            self._generation = target
+            for item_id, document, ref in written:
+                if item_id not in self._rows:
+                    continue
+                if item_id in pending:
+                    # Unsaved at the snapshot; now written unless replaced since
+                    if self._documents.get(item_id) is document:
+                        del self._documents[item_id]
+                        self._document_refs[item_id] = ref
+                elif self._document_refs.get(item_id) == refs.get(item_id):
+                    self._document_refs[item_id] = ref
+            self._records = len(batch)
+            self._vector_rows = len(batch)
+            self._document_bytes = sum(ref[1] for _, _, ref in written)
+        for path in self._files(generation):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return True
+
+    def _read_documents(self, generation: int, wanted: list) -> list:
+        """(key, text) for each (key, (offset, length)) in `wanted`."""
+        if not wanted:
+            return []
+        texts = []
+        with open(self._path(f"documents.{generation}.txt"), "rb") as f:
+            for key, (offset, length) in wanted:
+                f.seek(offset)
+                texts.append((key, f.read(length).decode("utf-8")))
+        return texts
+
+    def _write_meta(self, generation: int, dim: int) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path("meta.tmp.json")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "dim": dim}, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    def load(self) -> bool:
+        if not self.directory or not os.path.exists(self._path("meta.json")):
+            return False
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        generation, dim = meta["generation"], meta["dim"]
+        vectors_path, documents_path, log_path = self._files(generation)
+        vectors = np.fromfile(vectors_path, dtype=np.float32) if os.path.exists(vectors_path) else np.zeros(0, np.float32)
+        vectors = vectors[:len(vectors) // dim * dim].reshape(-1, dim) if dim else vectors.reshape(0, 0)
+        document_bytes = os.path.getsize(documents_path) if os.path.exists(documents_path) else 0
+        items = {}
+        records = 0
+        try:
+            with open(log_path, encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn final line
+                    ref = record.get("document")
+                    if not record.get("removed") and (
+                        record["vector"] >= len(vectors) or (ref and sum(ref) > document_bytes)
+                    ):
+                        break
+                    records += 1
+                    if record.get("removed"):
+                        items.pop(record["id"], None)
+                    else:
+                        items[record["id"]] = record
+        except OSError:
+            pass
+        with self._lock:
+            self._ids = list(items)
+            self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+            self._metadata = {
+                item_id: record["metadata"] for item_id, record in items.items()
+                if record.get("metadata") is not None
+            }
+            self._documents = {}
+            self._document_refs = {
+                item_id: tuple(record["document"]) for item_id, record in items.items()
+                if record.get("document")
+            }
+            self._matrix = None
+            self._drop_ivf()
+            if items:
+                self._grow(len(items), dim)
+                self._matrix[:len(items)] = vectors[[record["vector"] for record in items.values()]]
+            self._unsaved = {}
+            self._generation = generation
+            self._records = records
+            self._vector_rows = len(vectors)
+            self._document_bytes = document_bytes
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._ids),
+            "mode": self.mode,
+            "ivf_lists": len(self._lists) if self._lists is not None else 0,
+            "ivf_building": self._building,
+            "n_probe": self.probes,
+            "persistent": bool(self.directory),
+            "unsaved": len(self._unsaved),
+        }
@@ -0,0 +1,69 @@
+"""
+Bounded executors for CPU-bound work.
+Keeps model inference and parsing off the event loop and rejects new work
+when the queue is full instead of letting latency grow without limit.
+"""
+import asyncio
+import functools
+
+
+class QueueFullError(Exception):
+    """Raised when a pool has no room for more work."""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"{pool_name} queue is full")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Wraps a concurrent.futures executor with admission control.
+
+    `max_pending` caps queued plus running tasks; callers beyond that get a
+    QueueFullError carrying a Retry-After hint. The pending counter is only
+    touched from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, name: str, executor_factory, max_pending: int, retry_after: int = 1):
+        self.name = name
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._executor is None:
+            self._executor = self._executor_factory()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and await its result."""
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(self.name, self.retry_after)
+        self.start()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
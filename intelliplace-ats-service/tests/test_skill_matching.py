@@ -0,0 +1,27 @@
+"""Skill aliases in job requirements match canonical resume skills."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.resume_parser import ResumeParser  # noqa: E402
+from services.scoring_engine import ScoringEngine  # noqa: E402
+
+
+def test_alias_requirements_match_canonical_resume_skills():
+    parsed = ResumeParser().parse("Skills: ML, JS, K8s, Postgres, NLP")
+    assert "kubernetes" in parsed["skills"]
+
+    ratio = ScoringEngine().calculate_skill_match(parsed["skills"], ["ML", "JS", "K8s", "Postgres", "NLP"])
+    assert ratio == 1.0
+
+
+def test_canonical_requirement_matches_alias_on_resume():
+    parsed = ResumeParser().parse("Deployed services on k8s")
+    assert ScoringEngine().calculate_skill_match(parsed["skills"], ["Kubernetes"]) == 1.0
+
+
+def test_unknown_requirements_still_compared_literally():
+    engine = ScoringEngine()
+    assert engine.calculate_skill_match(["javascript"], ["Fortran"]) == 0.0
+    assert engine.calculate_skill_match(["fortran 90"], ["Fortran"]) == 1.0
@@ -0,0 +1,77 @@
+"""IVF recall against exact search, and append-only persistence of the vector index."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vector_index import VectorIndex  # noqa: E402
+
+
+def clustered_unit_vectors(n, dim=64, centers=200, spread=1.5, seed=0):
+    """Points around random centres, overlapping enough that a few probes miss neighbours."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((centers, dim))
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    points = centroids[rng.integers(0, centers, n)] + spread * rng.standard_normal((n, dim)) / np.sqrt(dim)
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_ivf_recall_at_10():
+    data = clustered_unit_vectors(20100)
+    pool, queries = data[:20000], data[20000:]
+    index = VectorIndex(ivf_threshold=len(pool) + 1)
+    for i, vector in enumerate(pool):
+        index.upsert(i, vector)
+    index.ivf_threshold = len(pool)
+    index.build_ivf()
+    assert index.mode == "ivf"
+
+    recall = np.mean([
+        len({int(i) for i in np.argsort(-(pool @ q))[:10]} & {int(i) for i, _ in index.search(q, 10)}) / 10
+        for q in queries
+    ])
+    assert recall >= 0.95, f"recall@10 {recall:.2f} with {index.probes} of {len(index._lists)} lists"
+
+
+def test_save_appends_and_load_restores(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((3, 8)).astype(np.float32)
+    index = VectorIndex(str(tmp_path))
+    index.upsert("a", vectors[0], {"n": 1}, "resume a")
+    index.upsert("b", vectors[1], {}, "resume b")
+    assert index.save()
+    size = os.path.getsize(tmp_path / "documents.0.txt")
+
+    index.upsert("a", vectors[2], {"n": 2})  # document unchanged
+    index.remove("b")
+    index.upsert("c", vectors[1], {}, "resume c")
+    assert index.save()
+    assert not index.save()
+    # Only the new document was appended
+    assert os.path.getsize(tmp_path / "documents.0.txt") == size + len("resume c")
+
+    loaded = VectorIndex(str(tmp_path))
+    assert loaded.load()
+    assert len(loaded) == 2 and "b" not in loaded
+    assert loaded.get_metadata("a") == {"n": 2}
+    assert loaded.get_documents(["a", "c", "b"]) == ["resume a", "resume c", None]
+    np.testing.assert_array_equal(loaded.get_vectors(["a", "c"]), vectors[[2, 1]])
+
+
+def test_compaction_keeps_live_items(tmp_path):
+    rng = np.random.default_rng(2)
+    index = VectorIndex(str(tmp_path))
+    for round_ in range(40):
+        for i in range(30):
+            index.upsert(i, rng.standard_normal(8).astype(np.float32), {"round": round_}, f"resume {i}")
+        index.save()
+    assert index._generation > 0
+    assert not os.path.exists(tmp_path / "log.0.jsonl")
+
+    loaded = VectorIndex(str(tmp_path))
+    loaded.load()
+    assert len(loaded) == 30
+    assert loaded.get_metadata(7) == {"round": 39}
+    assert loaded.get_documents([7]) == ["resume 7"]
@@ -1,26 +1,24 @@
 import os
 import json
-import base64
-import tempfile
+import importlib
 import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import google.generativeai as genai
 from dotenv import load_dotenv
-import speech_recognition as sr
-import librosa
-import cv2
-from PIL import Image
-import io
-
-# Optional imports - DeepFace may fail on Windows
-DEEPFACE_AVAILABLE = False
-try:
-    from deepface import DeepFace
-    DEEPFACE_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: DeepFace not available - emotion analysis will be disabled. Error: {e}")
-    print("Note: This is common on Windows. The service will still work for other features.")
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.acoustic_features import confidence_score, extract_features
+from services.answer_grading import chunk_answers, parse_batch_grades
+from services.features import FeatureUnavailableError, LazyFeature
+from services.job_queue import JobQueue, QueueFullError, SqliteJobStore
+from services.interview_sessions import InterviewSession, SessionStore
+from services.llm_cache import LLMCache
+from services.llm_client import FakeBackend, GeminiBackend, LLMClient, LLMUnavailableError, is_transient
+from services.speculation import QuestionSpeculator
+from services.stage_graph import StageGraph
+from services.vad import detect_speech
 
 load_dotenv()
 
@@ -28,12 +26,157 @@ app = Flask(__name__)
 CORS(app)
 
 
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is required")
+def _load_emotion_engine():
+    # DeepFace pulls in TensorFlow and may fail on Windows; the service
+    # still works for other features.
+    # Only the imports happen here, possibly in the gunicorn master; the Keras
+    # model is built after the fork (warm_up or first use), since TensorFlow
+    # runtime state does not survive fork().
+    from services.emotion_engine import EmotionEngine
+    engine = EmotionEngine()
+    if not engine.import_dependencies():
+        raise RuntimeError(engine.load_error)
+    return engine
+
+
+# Heavy analysis dependencies load on first use; PRELOAD_FEATURES ("all",
+# "none" or a comma list of names) loads them at startup instead. Under
+# gunicorn that happens in the master (preload_app), so workers share the
+# imported libraries copy-on-write; warm_up() then runs once in each worker
+# and builds the emotion model there.
+def _load_audio():
+    # Includes one decode, so load_ms covers librosa's lazily loaded resampler
+    audio = importlib.import_module('services.audio')
+    audio.warm_up()
+    return audio
+
+
+speech_feature = LazyFeature('speech_to_text', lambda: importlib.import_module('speech_recognition'))
+audio_feature = LazyFeature('audio_decoding', _load_audio)
+emotion_feature = LazyFeature('emotion_analysis', _load_emotion_engine)
+FEATURES = (speech_feature, audio_feature, emotion_feature)
+
+PRELOAD_FEATURES = os.getenv('PRELOAD_FEATURES', 'all').strip().lower()
+for _feature in FEATURES:
+    if PRELOAD_FEATURES == 'all' or _feature.name in PRELOAD_FEATURES.split(','):
+        _feature.load()
+
+models_warm = threading.Event()
+
+
+def warm_up():
+    """Run each loaded local model once; /ready reports ready afterwards."""
+    try:
+        if emotion_feature.available:
+            emotion_feature.get().warm_up()
+        if audio_feature.available:
+            # Decode and resample a short 48 kHz WAV, as an upload would be
+            audio_feature.get().warm_up()
+        # One second of silence at the analysis rate
+        extract_features(np.zeros(16000, dtype=np.float32), 16000)
+    except Exception as e:
+        print(f"Warm-up error: {str(e)}")
+    finally:
+        models_warm.set()
+
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+
+# LLM_BACKEND=fake answers locally (configurable latency and failure rate) so
+# load tests run offline without a Gemini key or quota
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini').lower()
+if LLM_BACKEND == 'fake':
+    llm_backend = FakeBackend(
+        latency_ms=float(os.getenv('LLM_FAKE_LATENCY_MS', 800)),
+        jitter_ms=float(os.getenv('LLM_FAKE_JITTER_MS', 200)),
+        error_rate=float(os.getenv('LLM_FAKE_ERROR_RATE', 0))
+    )
+else:
+    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY environment variable is required")
+    llm_backend = GeminiBackend(GEMINI_API_KEY, GEMINI_MODEL)
+
+llm_client = LLMClient(
+    llm_backend,
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 8)),
+    deadline_seconds=float(os.getenv('LLM_DEADLINE_SECONDS', 25)),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+    breaker_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', 5)),
+    breaker_reset_seconds=float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30))
+)
+
+# Gemini responses keyed by prompt hash. Question prompts carry the whole
+# conversation, so their short TTL mostly absorbs retries and double submits;
+# grading of an identical question/answer pair is stable for much longer.
+llm_cache = LLMCache(
+    llm_client.generate,
+    model_name=llm_backend.name,
+    max_entries=int(os.getenv('LLM_CACHE_SIZE', 1024)),
+    disk_dir=os.getenv('LLM_CACHE_DIR') or None,
+    disk_max_entries=int(os.getenv('LLM_CACHE_DISK_MAX_ENTRIES', 20000)),
+    ttls={
+        'tech_question': int(os.getenv('LLM_CACHE_QUESTION_TTL_SECONDS', 300)),
+        'hr_question': int(os.getenv('LLM_CACHE_QUESTION_TTL_SECONDS', 300)),
+        'grading': int(os.getenv('LLM_CACHE_GRADING_TTL_SECONDS', 86400)),
+        'grading_batch': int(os.getenv('LLM_CACHE_GRADING_TTL_SECONDS', 86400)),
+    }
+)
+
+# Shared pool for /analyze-answer stages (STT, audio features, emotions, grading)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', 8))
+analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='analysis')
+
+# Background analysis jobs (POST /analyze-answer with "async": true)
+# With several server processes, ANALYSIS_JOB_DB lets any of them answer polls
+ANALYSIS_JOB_DB = os.getenv('ANALYSIS_JOB_DB')
+analysis_jobs = JobQueue(
+    workers=int(os.getenv('ANALYSIS_JOB_WORKERS', 4)),
+    max_pending=int(os.getenv('ANALYSIS_JOB_QUEUE', 64)),
+    ttl_seconds=int(os.getenv('ANALYSIS_JOB_TTL_SECONDS', 3600)),
+    retry_after=int(os.getenv('ANALYSIS_JOB_RETRY_AFTER_SECONDS', 5)),
+    store=SqliteJobStore(ANALYSIS_JOB_DB) if ANALYSIS_JOB_DB else None,
+    # Callbacks are POSTed from inside the cluster; only these hosts may receive them
+    callback_hosts=os.getenv('ANALYSIS_CALLBACK_HOSTS', '').split(',')
+)
+
+# Interview sessions: context sent once, history folded to a token budget
+SESSION_HISTORY_TOKEN_BUDGET = int(os.getenv('SESSION_HISTORY_TOKEN_BUDGET', 1200))
+interview_sessions = SessionStore(
+    max_sessions=int(os.getenv('SESSION_MAX', 1000)),
+    ttl_seconds=int(os.getenv('SESSION_TTL_SECONDS', 6 * 3600)),
+    db_path=os.getenv('SESSION_DB') or None
+)
+
+# Next-question speculation: started once an answer's transcript is known,
+# served by the next /generate-question when its prompt matches
+SPECULATION_ENABLED = os.getenv('SPECULATION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+question_speculator = QuestionSpeculator(
+    lambda prompt, prompt_type: generate_question_text(prompt, prompt_type),
+    workers=int(os.getenv('SPECULATION_WORKERS', 2)),
+    per_session=int(os.getenv('SPECULATION_PER_SESSION', 2)),
+    max_pending=int(os.getenv('SPECULATION_MAX_PENDING', 8)),
+    wait_seconds=float(os.getenv('SPECULATION_WAIT_SECONDS', 30))
+)
+
+# Per-stage deadlines (seconds); a stage that misses its deadline falls back
+# to a partial result instead of failing the whole answer.
+STT_TIMEOUT = float(os.getenv('STT_TIMEOUT_SECONDS', 30))
+AUDIO_ANALYSIS_TIMEOUT = float(os.getenv('AUDIO_ANALYSIS_TIMEOUT_SECONDS', 20))
+EMOTION_TIMEOUT = float(os.getenv('EMOTION_TIMEOUT_SECONDS', 30))
+GRADING_TIMEOUT = float(os.getenv('GRADING_TIMEOUT_SECONDS', 30))
 
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-2.5-flash')
+# /grade-interview: answers per LLM call are limited by a token budget
+GRADING_BATCH_TOKEN_BUDGET = int(os.getenv('GRADING_BATCH_TOKEN_BUDGET', 6000))
+MAX_GRADING_BATCH = int(os.getenv('MAX_GRADING_BATCH', 50))
+
+# Trim silence before speech-to-text and acoustic features
+VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Keyframe sampling for emotion analysis (overridable per request)
+FRAME_BUDGET = int(os.getenv('FRAME_BUDGET', 10))
+MAX_FRAME_BUDGET = int(os.getenv('MAX_FRAME_BUDGET', 32))
+FRAME_DEDUP_DISTANCE = int(os.getenv('FRAME_DEDUP_DISTANCE', 5))
 
 
 def _resume_snippet(resume_excerpt, max_chars=10000):
@@ -43,7 +186,7 @@ def _resume_snippet(resume_excerpt, max_chars=10000):
     return s[:max_chars]
 
 
-def generate_tech_question(
+def build_tech_question_prompt(
     job_title,
     job_description,
     required_skills,
@@ -52,6 +195,7 @@ def generate_tech_question(
     resume_excerpt=None,
     conversation_history=None,
     next_question_index=0,
+    conversation_summary=None,
 ):
     context = f"""
     Job Title: {job_title}
@@ -77,6 +221,9 @@ Candidate resume / CV (plain text — use employers, projects, stack, education
     if previous_questions:
         context += f"\nPrevious Questions Asked: {', '.join(previous_questions)}"
 
+    if conversation_summary:
+        context += f"\n\nEarlier in this interview (summary):\n{conversation_summary}"
+
     if conversation_history:
         turns = []
         for i, turn in enumerate(conversation_history):
@@ -109,22 +256,17 @@ Candidate resume / CV (plain text — use employers, projects, stack, education
 
     Return ONLY the question text, nothing else.
     """
-    
-    try:
-        response = model.generate_content(prompt)
-        question = response.text.strip()
-        return question
-    except Exception as e:
-        raise Exception(f"Error generating question: {str(e)}")
+    return prompt
 
 
-def generate_hr_question(
+def build_hr_question_prompt(
     job_title,
     job_description,
     candidate_profile=None,
     previous_questions=None,
     resume_excerpt=None,
     conversation_history=None,
+    conversation_summary=None,
 ):
     context = f"""
     Job Title: {job_title}
@@ -146,6 +288,9 @@ Candidate resume / CV (plain text — anchor behavioral questions in roles, educ
     if previous_questions:
         context += f"\nPrevious Questions Asked: {', '.join(previous_questions)}"
 
+    if conversation_summary:
+        context += f"\n\nEarlier in this interview (summary):\n{conversation_summary}"
+
     if conversation_history:
         turns = []
         for turn in conversation_history:
@@ -170,15 +315,79 @@ Candidate resume / CV (plain text — anchor behavioral questions in roles, educ
 
     Return ONLY the question text, nothing else.
     """
-    
+    return prompt
+
+
+def question_prompt(mode, context, previous_questions=None, conversation_history=None,
+                    next_question_index=0, conversation_summary=None):
+    """(prompt, prompt_type) for the next question of a TECH or HR interview."""
+    if mode == 'TECH':
+        prompt = build_tech_question_prompt(
+            job_title=context.get('job_title', ''),
+            job_description=context.get('job_description', ''),
+            required_skills=context.get('required_skills') or [],
+            candidate_skills=context.get('candidate_skills'),
+            previous_questions=previous_questions,
+            resume_excerpt=context.get('resume_excerpt') or '',
+            conversation_history=conversation_history,
+            next_question_index=next_question_index,
+            conversation_summary=conversation_summary,
+        )
+        return prompt, 'tech_question'
+    prompt = build_hr_question_prompt(
+        job_title=context.get('job_title', ''),
+        job_description=context.get('job_description', ''),
+        candidate_profile=context.get('candidate_profile'),
+        previous_questions=previous_questions,
+        resume_excerpt=context.get('resume_excerpt') or '',
+        conversation_history=conversation_history,
+        conversation_summary=conversation_summary,
+    )
+    return prompt, 'hr_question'
+
+
+def session_question_prompt(session):
+    """(prompt, prompt_type) for a session's next question, from its stored history."""
+    return question_prompt(
+        (session.context.get('mode') or '').upper(),
+        session.context,
+        previous_questions=[turn["question"] for turn in session.turns],
+        conversation_history=[
+            {"question": turn["question"], "answer": turn.get("answer") or ""} for turn in session.turns
+        ],
+        next_question_index=session.question_count,
+        conversation_summary=session.summary,
+    )
+
+
+def generate_question_text(prompt, prompt_type):
     try:
-        response = model.generate_content(prompt)
-        question = response.text.strip()
-        return question
+        return llm_cache.generate(prompt, prompt_type).strip()
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         raise Exception(f"Error generating question: {str(e)}")
 
 
+def speculate_next_question(session_id, answer):
+    """
+    Start generating the question that follows `answer` in a session, so the
+    client's next /generate-question (sending the same answer) finds it ready.
+    """
+    try:
+        session = interview_sessions.get(str(session_id))
+        if session is None or not session.turns or session.turns[-1].get("answer") is not None:
+            return
+        session.record_answer(answer)
+        session.fold(SESSION_HISTORY_TOKEN_BUDGET)
+        if (session.context.get('mode') or '').upper() not in ['TECH', 'HR']:
+            return
+        prompt, prompt_type = session_question_prompt(session)
+        question_speculator.speculate(str(session_id), prompt, prompt_type)
+    except Exception as e:
+        print(f"Speculation error: {str(e)}")
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     
@@ -189,13 +398,85 @@ def health_check():
         "features": {
             "speech_to_text": True,
             "audio_analysis": True,
-            "emotion_analysis": DEEPFACE_AVAILABLE,
+            "emotion_analysis": emotion_feature.available is not False,
             "content_grading": True
         },
-        "deepface_available": DEEPFACE_AVAILABLE
+        "deepface_available": emotion_feature.available,
+        "feature_modules": {feature.name: feature.stats() for feature in FEATURES},
+        "llm_client": llm_client.stats(),
+        "llm_cache": llm_cache.stats(),
+        "interview_sessions": interview_sessions.stats(),
+        "question_speculation": dict(question_speculator.stats(), enabled=SPECULATION_ENABLED),
+        "analysis_jobs": analysis_jobs.stats()
     })
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once this process has warmed its models, 503 before."""
+    if models_warm.is_set():
+        return jsonify({
+            "ready": True,
+            "emotion_model": bool(emotion_feature.available and emotion_feature.get().available)
+        })
+    response = jsonify({"ready": False})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+
+def start_session(session_id, data):
+    """New session from a full /generate-question style body."""
+    session = InterviewSession(session_id, data)
+    for turn in data.get('conversation_history') or []:
+        if isinstance(turn, dict):
+            session.turns.append({"question": turn.get("question", ""), "answer": turn.get("answer", "")})
+    asked = {turn["question"] for turn in session.turns}
+    for question in data.get('previous_questions') or []:
+        if question not in asked:
+            session.turns.append({"question": question, "answer": None})
+    return session
+
+
+@app.route('/sessions/<session_id>', methods=['PUT'])
+def put_session(session_id):
+    """Create or replace a session's context (and optionally its history so far)."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Request body is required"}), 400
+    if (data.get('mode') or '').upper() not in ['TECH', 'HR']:
+        return jsonify({"error": "Mode must be 'TECH' or 'HR'"}), 400
+    if not data.get('job_title') or not data.get('job_description'):
+        return jsonify({"error": "job_title and job_description are required"}), 400
+    session = start_session(session_id, data)
+    session.fold(SESSION_HISTORY_TOKEN_BUDGET)
+    interview_sessions.put(session)
+    question_speculator.discard(session_id)
+    return jsonify({"success": True, "session_id": session_id, "question_count": session.question_count}), 200
+
+
+@app.route('/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    session = interview_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found or expired"}), 404
+    return jsonify({
+        "success": True,
+        "session_id": session_id,
+        "question_count": session.question_count,
+        "recent_turns": session.turns,
+        "summary": session.summary,
+        "history_tokens": session.history_tokens()
+    }), 200
+
+
+@app.route('/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    question_speculator.discard(session_id)
+    if not interview_sessions.delete(session_id):
+        return jsonify({"error": "Session not found or expired"}), 404
+    return jsonify({"success": True}), 200
+
+
 @app.route('/generate-question', methods=['POST'])
 def generate_question():
     try:
@@ -204,121 +485,106 @@ def generate_question():
         if not data:
             return jsonify({"error": "Request body is required"}), 400
         
-        mode = data.get('mode', '').upper()
+        # With a session_id the context is stored here: the first call sends it
+        # in full (or PUT /sessions/<id>), later calls send only `answer`.
+        session_id = data.get('session_id')
+        session = None
+        if session_id:
+            session_id = str(session_id)
+            session = interview_sessions.get(session_id)
+            if session is None:
+                if not data.get('job_title') or not data.get('job_description'):
+                    return jsonify({"error": "Session not found or expired; send the full interview context"}), 404
+                session = start_session(session_id, data)
+            if data.get('answer') is not None:
+                session.record_answer(data['answer'])
+            session.fold(SESSION_HISTORY_TOKEN_BUDGET)
+            context = dict(session.context)
+        else:
+            context = data
+        
+        mode = (context.get('mode') or '').upper()
         if mode not in ['TECH', 'HR']:
             return jsonify({"error": "Mode must be 'TECH' or 'HR'"}), 400
         
-        job_title = data.get('job_title', '')
-        job_description = data.get('job_description', '')
+        job_title = context.get('job_title', '')
+        job_description = context.get('job_description', '')
         
         if not job_title or not job_description:
             return jsonify({"error": "job_title and job_description are required"}), 400
         
-        required_skills = data.get('required_skills', [])
-        candidate_skills = data.get('candidate_skills')
-        candidate_profile = data.get('candidate_profile')
-        previous_questions = data.get('previous_questions', [])
-        resume_excerpt = data.get('resume_excerpt') or ''
-        conversation_history = data.get('conversation_history') or []
-        next_question_index = int(data.get('next_question_index') or 0)
-
-        if mode == 'TECH':
-            question = generate_tech_question(
-                job_title=job_title,
-                job_description=job_description,
-                required_skills=required_skills,
-                candidate_skills=candidate_skills,
-                previous_questions=previous_questions,
-                resume_excerpt=resume_excerpt,
-                conversation_history=conversation_history,
+        if session is not None:
+            prompt, prompt_type = session_question_prompt(session)
+            next_question_index = session.question_count
+            # A question speculated from this answer's transcript, if the
+            # context it was built from still matches exactly
+            question = None
+            if data.get('answer') is not None:
+                question = question_speculator.take(session_id, prompt)
+        else:
+            next_question_index = int(data.get('next_question_index') or 0)
+            prompt, prompt_type = question_prompt(
+                mode, context,
+                previous_questions=data.get('previous_questions', []),
+                conversation_history=data.get('conversation_history') or [],
                 next_question_index=next_question_index,
             )
-        else:  # HR mode
-            question = generate_hr_question(
-                job_title=job_title,
-                job_description=job_description,
-                candidate_profile=candidate_profile,
-                previous_questions=previous_questions,
-                resume_excerpt=resume_excerpt,
-                conversation_history=conversation_history,
-            )
+            question = None
+        if question is None:
+            question = generate_question_text(prompt, prompt_type)
         
-        return jsonify({
+        response = {
             "success": True,
             "question": question,
             "mode": mode
-        }), 200
+        }
+        if session is not None:
+            session.add_question(question)
+            interview_sessions.put(session)
+            response["session_id"] = session_id
+            response["question_index"] = next_question_index
+        return jsonify(response), 200
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except LLMUnavailableError as e:
+        # Circuit open: fail fast and tell the client when to try again
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = str(int(e.retry_after))
+        return response, 503
     except Exception as e:
         return jsonify({"error": f"Error generating question: {str(e)}"}), 500
 
 
-def transcribe_audio(audio_data_base64):
-    
+def transcribe_audio(clip):
+    """
+    Transcript of `clip`, or None when no speech could be made out. Request
+    and service errors propagate, so the stage is reported as failed.
+    """
+    sr = speech_feature.get()
+    audio = sr.AudioData(clip.to_pcm16(), clip.sample_rate, 2)
+    r = sr.Recognizer()
+    # Without a socket timeout a hung request would hold an analysis_pool
+    # thread long after the stage deadline gave up on it
+    r.operation_timeout = STT_TIMEOUT
     try:
-        
-        audio_bytes = base64.b64decode(audio_data_base64)
-        
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
-        
-       
-        r = sr.Recognizer()
-        with sr.AudioFile(tmp_path) as source:
-            audio = r.record(source)
-            text = r.recognize_google(audio)
-        
-       
-        os.unlink(tmp_path)
-        
-        return text
-    except Exception as e:
-        print(f"Speech recognition error: {str(e)}")
+        return r.recognize_google(audio)
+    except sr.UnknownValueError:
         return None
 
 
-def analyze_audio_confidence(audio_data_base64):
+def analyze_audio_confidence(clip):
    
     try:
         
-        audio_bytes = base64.b64decode(audio_data_base64)
-        
-       
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
-        
-        
-        y, sr = librosa.load(tmp_path, sr=None)
-        
-       
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_mean = np.mean(pitches[pitches > 0]) if np.any(pitches > 0) else 0
-        
-       
-        rms = librosa.feature.rms(y=y)[0]
-        energy_mean = np.mean(rms)
-        
-       
-        zcr = librosa.feature.zero_crossing_rate(y)[0]
-        zcr_mean = np.mean(zcr)
-        
-       
-        pitch_score = min(10, (pitch_mean / 200) * 3) if pitch_mean > 0 else 5
-        energy_score = min(10, (energy_mean / 0.1) * 5) if energy_mean > 0 else 5
-        zcr_score = max(0, 10 - (zcr_mean * 100))
-        
-        confidence_score = (pitch_score + energy_score + zcr_score) / 3
-        
-        
-        os.unlink(tmp_path)
+        # Pitch (YIN on voiced frames), RMS energy and ZCR in one vectorized pass
+        features = extract_features(clip.samples, clip.sample_rate)
+        pitch_mean = features["pitch_mean"]
+        energy_mean = features["energy_mean"]
+        zcr_mean = features["zcr_mean"]
         
         return {
-            "confidence_score": round(confidence_score, 2),
+            "confidence_score": round(confidence_score(features), 2),
             "pitch_mean": round(float(pitch_mean), 2) if pitch_mean > 0 else 0,
             "energy_mean": round(float(energy_mean), 4),
             "zcr_mean": round(float(zcr_mean), 4)
@@ -328,9 +594,13 @@ def analyze_audio_confidence(audio_data_base64):
         return {"confidence_score": 5.0, "error": str(e)}
 
 
-def analyze_emotions(video_frames_base64):
+def analyze_emotions(video_frames, frame_budget=None, dedup_distance=None):
     
-    if not DEEPFACE_AVAILABLE:
+    try:
+        emotion_engine = emotion_feature.get()
+    except FeatureUnavailableError:
+        emotion_engine = None
+    if emotion_engine is None or not emotion_engine.load():
         return {
             "emotions": {},
             "dominant_emotion": "neutral",
@@ -339,50 +609,19 @@ def analyze_emotions(video_frames_base64):
         }
     
     try:
-        emotions_list = []
+        from services.frame_sampler import select_keyframes
         
-        #
-        for frame_base64 in video_frames_base64[:10]:  # Limit to first 10 frames
-            try:
-               
-                image_bytes = base64.b64decode(frame_base64)
-                image = Image.open(io.BytesIO(image_bytes))
-                
-                # Convert to numpy array for DeepFace
-                img_array = np.array(image)
-                
-                # Analyze emotions
-                result = DeepFace.analyze(
-                    img_path=img_array,
-                    actions=['emotion'],
-                    enforce_detection=False
-                )
-                
-                if isinstance(result, list):
-                    result = result[0]
-                
-                emotions = result.get('emotion', {})
-                emotions_list.append(emotions)
-            except Exception as e:
-                print(f"Frame analysis error: {str(e)}")
-                continue
-        
-        if not emotions_list:
-            return {"emotions": {}, "dominant_emotion": "neutral"}
-        
-        
-        avg_emotions = {}
-        for emotion in emotions_list[0].keys():
-            avg_emotions[emotion] = np.mean([e.get(emotion, 0) for e in emotions_list])
-        
-        
-        dominant_emotion = max(avg_emotions, key=avg_emotions.get)
+        # Keyframes spread over the whole answer, near-duplicates dropped
+        images, sampling = select_keyframes(
+            video_frames,
+            budget=frame_budget or FRAME_BUDGET,
+            min_distance=FRAME_DEDUP_DISTANCE if dedup_distance is None else dedup_distance
+        )
         
-        return {
-            "emotions": {k: round(float(v), 2) for k, v in avg_emotions.items()},
-            "dominant_emotion": dominant_emotion,
-            "frames_analyzed": len(emotions_list)
-        }
+        # One detector pass per frame, then a single batched emotion forward pass
+        result = emotion_engine.analyze(images)
+        result["frame_sampling"] = sampling
+        return result
     except Exception as e:
         print(f"Emotion analysis error: {str(e)}")
         return {"emotions": {}, "dominant_emotion": "neutral", "error": str(e)}
@@ -416,8 +655,7 @@ def grade_answer_content(question, answer_text, mode="TECH"):
         }}
         """
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        response_text = llm_cache.generate(prompt, 'grading').strip()
         
         
         if '```json' in response_text:
@@ -425,7 +663,12 @@ def grade_answer_content(question, answer_text, mode="TECH"):
         elif '```' in response_text:
             response_text = response_text.split('```')[1].split('```')[0].strip()
         
-        result = json.loads(response_text)
+        try:
+            result = json.loads(response_text)
+        except ValueError:
+            # Don't keep serving a response we cannot parse
+            llm_cache.invalidate(prompt, 'grading')
+            raise
         return {
             "content_score": float(result.get("score", 5.0)),
             "feedback": result.get("feedback", "No feedback provided")
@@ -438,102 +681,369 @@ def grade_answer_content(question, answer_text, mode="TECH"):
         }
 
 
-@app.route('/analyze-answer', methods=['POST'])
-def analyze_answer():
+def build_batch_grading_prompt(items, mode):
+    answers = "\n\n".join(
+        f"### Answer {item['index']}\nQuestion: {item['question']}\nCandidate's Answer: {item['answer']}"
+        for item in items
+    )
+    return f"""
+    You are an expert interviewer evaluating a candidate's answers from one interview.
+    
+    Interview Mode: {mode}
+    
+    {answers}
+    
+    Evaluate EACH answer independently on a scale of 0-10 based on:
+    1. Relevance to the question
+    2. Depth and detail of the response
+    3. Technical accuracy (for TECH mode) or behavioral insight (for HR mode)
+    4. Clarity and communication
+    5. Completeness
     
+    For each answer provide:
+    1. A numerical score (0-10, with one decimal place)
+    2. Brief feedback (2-3 sentences)
+    
+    Format your response as JSON, with one entry per answer and "index" set to
+    the number after "Answer":
+    {{
+        "grades": [
+            {{"index": 0, "score": 8.5, "feedback": "The candidate demonstrated good understanding..."}}
+        ]
+    }}
+    """
+
+
+def grade_answer_batch(items, mode):
+    """
+    Grades for one chunk, {index: grade}; answers the reply did not cover are
+    absent. None when the call itself failed (timeout, upstream error or open
+    circuit), in which case grading each answer separately would fail too.
+    """
+    prompt = build_batch_grading_prompt(items, mode)
     try:
-        data = request.get_json()
+        response_text = llm_cache.generate(prompt, 'grading_batch')
+    except Exception as e:
+        print(f"Batch grading error: {str(e)}")
+        return None if isinstance(e, LLMUnavailableError) or is_transient(e) else {}
+    grades = parse_batch_grades(response_text, [item["index"] for item in items])
+    if len(grades) < len(items):
+        # Don't keep serving an incomplete reply
+        llm_cache.invalidate(prompt, 'grading_batch')
+    return grades
+
+
+def grade_interview_answers(items, mode):
+    """
+    Grade all answers of an interview with as few LLM calls as the token
+    budget allows. Answers missing from a batch reply are graded separately,
+    in parallel (grade_answer_content, which falls back to 5.0 itself); a
+    chunk whose call failed gets the 5.0 default without further calls.
+    """
+    chunks = chunk_answers(items, GRADING_BATCH_TOKEN_BUDGET)
+    grades = {}
+    defaulted = 0
+    for chunk, chunk_grades in zip(chunks, analysis_pool.map(lambda chunk: grade_answer_batch(chunk, mode), chunks)):
+        if chunk_grades is None:
+            defaulted += len(chunk)
+            for item in chunk:
+                grades[item["index"]] = {"content_score": 5.0, "feedback": "Error in grading: LLM unavailable"}
+        else:
+            grades.update(chunk_grades)
+
+    missing = [item for item in items if item["index"] not in grades]
+    individual = analysis_pool.map(
+        lambda item: grade_answer_content(item["question"], item["answer"], mode), missing
+    )
+    for item, grade in zip(missing, individual):
+        grades[item["index"]] = dict(grade, graded_individually=True)
+
+    results = [dict(grades[item["index"]], question=item["question"]) for item in items]
+    return results, {"batches": len(chunks), "individual_fallbacks": len(missing), "defaulted": defaulted}
+
+
+def run_answer_analysis(question, question_index, audio_data, video_frames, mode,
+                        frame_budget, frame_dedup_distance, session_id=None):
+    """Full answer analysis; shared by the synchronous and the job endpoints."""
+
+    results = {
+        "question_index": question_index,
+        "question": question
+    }
+    
+    # Audio features and emotion analysis run in the pool while
+    # transcription is in flight; grading starts once the transcript is in.
+    started = time.perf_counter()
+    graph = StageGraph(analysis_pool)
+    clip = None
+    if audio_data:
+        # Decode once; both audio stages share the same waveform
+        try:
+            clip = audio_feature.get().decode_audio(audio_data)
+        except Exception as e:
+            print(f"Audio decode error: {str(e)}")
+            results["audio_error"] = f"Could not decode audio: {str(e)}"
+    voice_activity = None
+    if clip is not None and VAD_ENABLED:
+        # Only the speech segments go to STT and feature extraction
+        vad_started = time.perf_counter()
+        activity = detect_speech(clip)
+        voice_activity = activity.stats()
+        if activity.has_speech:
+            clip = activity.voiced_clip(clip)
+        graph.timings["vad"] = round((time.perf_counter() - vad_started) * 1000, 1)
+    if clip is not None:
+        graph.submit("transcription", transcribe_audio, clip,
+                     timeout=STT_TIMEOUT, fallback=None)
+        graph.submit("audio_analysis", analyze_audio_confidence, clip,
+                     timeout=AUDIO_ANALYSIS_TIMEOUT,
+                     fallback={"confidence_score": 5.0, "error": "Audio analysis timed out"})
+    if video_frames:
+        graph.submit("emotion_analysis", analyze_emotions, video_frames,
+                     frame_budget, frame_dedup_distance,
+                     timeout=EMOTION_TIMEOUT,
+                     fallback={"emotions": {}, "dominant_emotion": "neutral", "error": "Emotion analysis timed out"})
+    
+    transcribed_text = None
+    if audio_data:
+        transcribed_text = graph.result("transcription") if clip is not None else None
+        results["transcribed_text"] = transcribed_text
+        if session_id and transcribed_text and SPECULATION_ENABLED:
+            # The next question can be drafted while the rest is analysed
+            speculate_next_question(session_id, transcribed_text)
         
-        if not data:
-            return jsonify({"error": "Request body is required"}), 400
+        graph.submit(
+            "content_grading",
+            grade_answer_content,
+            question,
+            transcribed_text or "Audio received but transcription unavailable",
+            mode,
+            timeout=GRADING_TIMEOUT,
+            fallback={"content_score": 5.0, "feedback": "Grading timed out"}
+        )
+    
+    confidence_analysis = None
+    if audio_data:
+        confidence_analysis = (
+            graph.result("audio_analysis") if clip is not None
+            else {"confidence_score": 5.0, "error": results["audio_error"]}
+        )
+        if voice_activity:
+            confidence_analysis["voice_activity"] = voice_activity
+        results["confidence_score"] = confidence_analysis.get("confidence_score", 5.0)
+        results["audio_analysis"] = confidence_analysis
+    
+
+    emotion_analysis = None
+    if video_frames:
+        emotion_analysis = graph.result("emotion_analysis")
+        results["emotion_scores"] = emotion_analysis.get("emotions", {})
+        results["dominant_emotion"] = emotion_analysis.get("dominant_emotion", "neutral")
+    
         
-        question = data.get('question', '')
-        question_index = data.get('question_index', 0)
+    content_grade = None
+    if audio_data:
+        content_grade = graph.result("content_grading")
+        results["content_score"] = content_grade.get("content_score", 5.0)
+        results["feedback"] = content_grade.get("feedback", "")
+    
+    results["stage_timings_ms"] = dict(graph.timings)
+    results["stage_timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 1)
+    results["stage_status"] = dict(graph.status)
+    
+    
+    scores = []
+    if results.get("content_score"):
+        scores.append(results["content_score"] * 0.5)  # 50% weight
+    if results.get("confidence_score"):
+        scores.append(results["confidence_score"] * 0.3)  # 30% weight
+    if emotion_analysis and emotion_analysis.get("emotions") and not emotion_analysis.get("error"):
+        
+        positive_emotions = emotion_analysis["emotions"].get("happy", 0) + \
+                          emotion_analysis["emotions"].get("neutral", 0) * 0.5
+        emotion_score = min(10, (positive_emotions / 100) * 10)
+        scores.append(emotion_score * 0.2)  # 20% weight
+    elif not emotion_analysis or emotion_analysis.get("error"):
+        
+        if results.get("content_score"):
+            scores.append(results["content_score"] * 0.1)  # Extra 10% to content
+        if results.get("confidence_score"):
+            scores.append(results["confidence_score"] * 0.1)  # Extra 10% to confidence
+    
+    overall_score = sum(scores) if scores else 5.0
+    results["overall_score"] = round(overall_score, 2)
+    
+    # Store full analysis data
+    results["analysis_data"] = {
+        "transcription": transcribed_text,
+        "audio_analysis": confidence_analysis,
+        "emotion_analysis": emotion_analysis,
+        "content_grade": content_grade
+    }
+    
+    return results
+
+
+def parse_answer_request():
+    """
+    Read /analyze-answer input from either request form.
+
+    JSON: `audio_data` and `video_frames` as base64 strings.
+    multipart/form-data: an `audio` file part and repeated `frames` file
+    parts (binary, no base64), with the other fields as form fields.
+
+    Returns (run_answer_analysis args, options); raises ValueError with a
+    client-facing message on invalid input.
+    """
+    if request.mimetype == 'multipart/form-data':
+        data = request.form
+        audio_data = request.files.get('audio')
+        video_frames = request.files.getlist('frames')
+    else:
+        data = request.get_json(silent=True)
+        if not data:
+            raise ValueError("Request body is required")
         audio_data = data.get('audio_data')
         video_frames = data.get('video_frames', [])
-        mode = data.get('mode', 'TECH').upper()
+    
+    question = data.get('question', '')
+    if not question:
+        raise ValueError("Question is required")
+    
+    question_index = data.get('question_index', 0)
+    if isinstance(question_index, str) and question_index.isdigit():
+        question_index = int(question_index)
+    
+    try:
+        frame_budget = max(1, min(int(data.get('frame_budget') or FRAME_BUDGET), MAX_FRAME_BUDGET))
+        frame_dedup_distance = data.get('frame_dedup_distance')
+        if frame_dedup_distance is not None:
+            frame_dedup_distance = int(frame_dedup_distance)
+    except (TypeError, ValueError):
+        raise ValueError("frame_budget and frame_dedup_distance must be integers")
+    
+    run_async = data.get('async')
+    if isinstance(run_async, str):
+        run_async = run_async.lower() in ('1', 'true', 'yes')
+    if run_async:
+        # File parts are closed when the request ends; a queued job keeps their bytes
+        if audio_data is not None and hasattr(audio_data, 'read'):
+            audio_data = audio_data.read()
+        video_frames = [f.read() if hasattr(f, 'read') else f for f in video_frames]
+    
+    args = (
+        question,
+        question_index,
+        audio_data,
+        video_frames,
+        data.get('mode', 'TECH').upper(),
+        frame_budget,
+        frame_dedup_distance,
+        data.get('session_id') or None
+    )
+    return args, {"async": bool(run_async), "callback_url": data.get('callback_url')}
+
+
+@app.route('/analyze-answer', methods=['POST'])
+def analyze_answer():
+    
+    try:
+        try:
+            args, options = parse_answer_request()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        if not question:
-            return jsonify({"error": "Question is required"}), 400
+        if options["async"]:
+            # Enqueue and return immediately; poll GET /analyze-answer/<job_id>
+            callback_url = options["callback_url"]
+            if callback_url:
+                try:
+                    analysis_jobs.check_callback_url(callback_url)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+            try:
+                job_id = analysis_jobs.submit(run_answer_analysis, *args, callback_url=callback_url)
+            except QueueFullError as e:
+                response = jsonify({"error": "Analysis queue is full, retry later"})
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 503
+            return jsonify({
+                "success": True,
+                "data": {
+                    "job_id": job_id,
+                    "status": "queued",
+                    "status_url": f"/analyze-answer/{job_id}"
+                }
+            }), 202
         
-        results = {
-            "question_index": question_index,
-            "question": question
-        }
+        return jsonify({
+            "success": True,
+            "data": run_answer_analysis(*args)
+        }), 200
         
+    except Exception as e:
+        return jsonify({"error": f"Error analyzing answer: {str(e)}"}), 500
+
+
+@app.route('/analyze-answer/<job_id>', methods=['GET'])
+def analyze_answer_status(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify({
+        "success": True,
+        "data": job
+    }), 200
+
+
+@app.route('/grade-interview', methods=['POST'])
+def grade_interview():
+    """Grade every answer of an interview at once, e.g. for the final report."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Request body is required"}), 400
         
-        transcribed_text = None
-        if audio_data:
-            transcribed_text = transcribe_audio(audio_data)
-            results["transcribed_text"] = transcribed_text
-        
-        
-        confidence_analysis = None
-        if audio_data:
-            confidence_analysis = analyze_audio_confidence(audio_data)
-            results["confidence_score"] = confidence_analysis.get("confidence_score", 5.0)
-            results["audio_analysis"] = confidence_analysis
-        
-
-        emotion_analysis = None
-        if video_frames:
-            emotion_analysis = analyze_emotions(video_frames)
-            results["emotion_scores"] = emotion_analysis.get("emotions", {})
-            results["dominant_emotion"] = emotion_analysis.get("dominant_emotion", "neutral")
-        
-            
-        content_grade = None
-        if transcribed_text:
-            content_grade = grade_answer_content(question, transcribed_text, mode)
-            results["content_score"] = content_grade.get("content_score", 5.0)
-            results["feedback"] = content_grade.get("feedback", "")
-        elif audio_data:
-            
-            content_grade = grade_answer_content(
-                question, 
-                "Audio received but transcription unavailable", 
-                mode
-            )
-            results["content_score"] = content_grade.get("content_score", 5.0)
-            results["feedback"] = content_grade.get("feedback", "")
+        answers = data.get('answers')
+        if not isinstance(answers, list) or not answers:
+            return jsonify({"error": "answers must be a non-empty list of {question, answer}"}), 400
+        if len(answers) > MAX_GRADING_BATCH:
+            return jsonify({"error": f"At most {MAX_GRADING_BATCH} answers per request"}), 400
+        
+        mode = (data.get('mode') or 'TECH').upper()
+        if mode not in ['TECH', 'HR']:
+            return jsonify({"error": "Mode must be 'TECH' or 'HR'"}), 400
         
+        items = []
+        for position, entry in enumerate(answers):
+            if not isinstance(entry, dict) or not entry.get('question'):
+                return jsonify({"error": f"answers[{position}] needs a question"}), 400
+            answer_text = str(entry.get('answer') or entry.get('transcribed_text') or '').strip()
+            items.append({
+                "index": position,
+                "question": str(entry['question']),
+                "answer": answer_text or "Audio received but transcription unavailable"
+            })
         
-        scores = []
-        if results.get("content_score"):
-            scores.append(results["content_score"] * 0.5)  # 50% weight
-        if results.get("confidence_score"):
-            scores.append(results["confidence_score"] * 0.3)  # 30% weight
-        if emotion_analysis and emotion_analysis.get("emotions") and not emotion_analysis.get("error"):
-            
-            positive_emotions = emotion_analysis["emotions"].get("happy", 0) + \
-                              emotion_analysis["emotions"].get("neutral", 0) * 0.5
-            emotion_score = min(10, (positive_emotions / 100) * 10)
-            scores.append(emotion_score * 0.2)  # 20% weight
-        elif not emotion_analysis or emotion_analysis.get("error"):
-            
-            if results.get("content_score"):
-                scores.append(results["content_score"] * 0.1)  # Extra 10% to content
-            if results.get("confidence_score"):
-                scores.append(results["confidence_score"] * 0.1)  # Extra 10% to confidence
-        
-        overall_score = sum(scores) if scores else 5.0
-        results["overall_score"] = round(overall_score, 2)
-        
-        # Store full analysis data
-        results["analysis_data"] = {
-            "transcription": transcribed_text,
-            "audio_analysis": confidence_analysis,
-            "emotion_analysis": emotion_analysis,
-            "content_grade": content_grade
-        }
+        started = time.perf_counter()
+        grades, stats = grade_interview_answers(items, mode)
+        for position, (grade, entry) in enumerate(zip(grades, answers)):
+            grade["question_index"] = entry.get('question_index', position)
         
         return jsonify({
             "success": True,
-            "data": results
+            "data": {
+                "grades": grades,
+                "average_content_score": round(sum(g["content_score"] for g in grades) / len(grades), 2),
+                "llm_batches": stats["batches"],
+                "individual_fallbacks": stats["individual_fallbacks"],
+                "defaulted": stats["defaulted"],
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
         }), 200
         
     except Exception as e:
-        return jsonify({"error": f"Error analyzing answer: {str(e)}"}), 500
+        return jsonify({"error": f"Error grading interview: {str(e)}"}), 500
 
 
 @app.route('/', methods=['GET'])
@@ -545,12 +1055,19 @@ def root():
         "version": "2.0.0",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
             "generate_question": "/generate-question (POST)",
-            "analyze_answer": "/analyze-answer (POST)"
+            "sessions": "/sessions/<session_id> (PUT, GET, DELETE)",
+            "analyze_answer": "/analyze-answer (POST)",
+            "analyze_answer_job": "/analyze-answer/<job_id> (GET)",
+            "grade_interview": "/grade-interview (POST)"
         }
     })
 
 
 if __name__ == '__main__':
+    # Development server; use `gunicorn -c gunicorn.conf.py app:app` in production
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
     port = int(os.getenv('PORT', 8001))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    debug = os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
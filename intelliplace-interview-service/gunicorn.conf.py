@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the interview service.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app), so the TensorFlow/
+DeepFace, OpenCV and librosa imports happen a single time and are shared
+copy-on-write by the forked workers. TensorFlow is not fork-safe, so the
+emotion model itself is built in each worker after the fork, by its warm-up.
+"""
+import os
+import threading
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8001')}"
+preload_app = True
+
+# Threads serve concurrent requests inside a worker; the heavy stages release
+# the GIL (NumPy, OpenCV, TensorFlow, network I/O).
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# A synchronous /analyze-answer waits for STT and then grading (30 s deadlines
+# each by default), so the worker timeout must cover both plus decoding.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+# Let in-flight analyses finish on reload or shutdown
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 90))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then to bound memory growth in native libraries
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    """Build and warm the models in the background; /ready answers 503 until done."""
+    import app
+
+    threading.Thread(target=app.warm_up, name="warm-up", daemon=True).start()
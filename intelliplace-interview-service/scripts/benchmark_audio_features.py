@@ -0,0 +1,150 @@
+"""
+Benchmark and regression check for the acoustic confidence features.
+
+Usage (from intelliplace-interview-service/):
+    python scripts/benchmark_audio_features.py [--seconds 60] [--rounds 3] [--check]
+
+Synthetic tones with a known fundamental are run through the vectorized
+extractor and the librosa piptrack/rms/zcr pipeline it replaced. Voice-like
+signals (5-12 harmonics with noise at 100-260 Hz, plus a 48 kHz WAV decoded
+the way uploads are) are the ones the confidence score must keep: with
+--check the script exits non-zero when the extracted pitch drifts from the
+fundamental, when energy or ZCR drift from the legacy pipeline, or when the
+confidence score of a voice-like signal drifts from the legacy score (per
+signal or on average). Pure sines are listed for reference only; piptrack
+reports their fundamental while it reports a harmonic average for voices.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.acoustic_features import confidence_score, extract_features  # noqa: E402
+from services.audio import ANALYSIS_SAMPLE_RATE, decode_audio  # noqa: E402
+
+SINE_HZ = [150, 220, 330, 440]
+VOICE_HZ = [100, 140, 180, 220, 260]
+VOICE_HARMONICS = [5, 8, 12]
+PITCH_TOLERANCE = 0.02
+FEATURE_TOLERANCE = 0.05
+# Piptrack's pitch depends on how many harmonics a voice has, the fundamental
+# does not, so single signals may differ by up to this much...
+SCORE_TOLERANCE = 1.0
+# ...but across the voice-like set the scores must agree on average
+MEAN_SCORE_TOLERANCE = 0.25
+
+
+def legacy_features(y, sr):
+    """The piptrack-based extraction analyze_audio_confidence used before."""
+    pitches, _ = librosa.piptrack(y=y, sr=sr)
+    pitch_mean = np.mean(pitches[pitches > 0]) if np.any(pitches > 0) else 0
+    return {
+        "pitch_mean": float(pitch_mean),
+        "energy_mean": float(np.mean(librosa.feature.rms(y=y)[0])),
+        "zcr_mean": float(np.mean(librosa.feature.zero_crossing_rate(y)[0])),
+    }
+
+
+def legacy_score(features):
+    """analyze_audio_confidence's scoring as it was with piptrack's pitch."""
+    pitch_mean, energy_mean, zcr_mean = features["pitch_mean"], features["energy_mean"], features["zcr_mean"]
+    pitch_score = min(10, (pitch_mean / 200) * 3) if pitch_mean > 0 else 5
+    energy_score = min(10, (energy_mean / 0.1) * 5) if energy_mean > 0 else 5
+    zcr_score = max(0, 10 - (zcr_mean * 100))
+    return (pitch_score + energy_score + zcr_score) / 3
+
+
+def tone(freq, seconds, sr, harmonics=1, amplitude=0.3):
+    t = np.arange(int(seconds * sr)) / sr
+    y = sum(amplitude / k * np.sin(2 * np.pi * freq * k * t) for k in range(1, harmonics + 1))
+    return y.astype(np.float32)
+
+
+def noisy(y, seed):
+    return y + np.random.default_rng(seed).normal(0, 0.01, len(y)).astype(np.float32)
+
+
+def decoded_wav(freq, seconds, harmonics=8, rate=48000):
+    """A 48 kHz PCM WAV with harmonics and noise, decoded like an upload."""
+    buffer = io.BytesIO()
+    sf.write(buffer, noisy(tone(freq, seconds, rate, harmonics), freq), rate, format="WAV", subtype="PCM_16")
+    return decode_audio(buffer.getvalue()).samples
+
+
+def signals(sr):
+    """(label, fundamental, waveform, voice-like) test signals at the analysis rate."""
+    for freq in SINE_HZ:
+        yield "sine", freq, tone(freq, 3, sr), False
+    for harmonics in VOICE_HARMONICS:
+        for freq in VOICE_HZ:
+            yield f"{harmonics} harmonics+noise", freq, noisy(tone(freq, 3, sr, harmonics), freq), True
+    for freq in (120, 220):
+        yield "48k wav decoded", freq, decoded_wav(freq, 3), True
+
+
+def relative_error(a, b):
+    return abs(a - b) / max(abs(b), 1e-9)
+
+
+def time_call(fn, y, sr, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(y, sr)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60, help="Length of the timed clip")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs per extractor")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions")
+    args = parser.parse_args()
+    sr = ANALYSIS_SAMPLE_RATE
+
+    failures = []
+    drifts = []
+    print(f"{'signal':<24}{'f0':>6}{'pitch new':>11}{'pitch old':>11}{'score new':>11}{'score old':>11}")
+    for label, freq, y, voice_like in signals(sr):
+        new, old = extract_features(y, sr), legacy_features(y, sr)
+        new_score, old_score = confidence_score(new), legacy_score(old)
+        print(
+            f"{label:<24}{freq:>6}{new['pitch_mean']:>11.1f}{old['pitch_mean']:>11.1f}"
+            f"{new_score:>11.2f}{old_score:>11.2f}"
+        )
+        if relative_error(new["pitch_mean"], freq) > PITCH_TOLERANCE:
+            failures.append(f"{label} {freq} Hz: pitch {new['pitch_mean']:.1f}")
+        for key in ("energy_mean", "zcr_mean"):
+            if relative_error(new[key], old[key]) > FEATURE_TOLERANCE:
+                failures.append(f"{label} {freq} Hz: {key} {new[key]:.4f} vs {old[key]:.4f}")
+        if voice_like:
+            drifts.append(new_score - old_score)
+            if abs(new_score - old_score) > SCORE_TOLERANCE:
+                failures.append(f"{label} {freq} Hz: score {new_score:.2f} vs {old_score:.2f}")
+
+    mean_drift = float(np.mean(drifts))
+    print(f"\nvoice-like score drift: mean {mean_drift:+.2f}, max {max(abs(d) for d in drifts):.2f}")
+    if abs(mean_drift) > MEAN_SCORE_TOLERANCE:
+        failures.append(f"mean voice-like score drift {mean_drift:+.2f}")
+
+    y = tone(180, args.seconds, sr, harmonics=5)
+    y = y + np.random.default_rng(0).normal(0, 0.01, len(y)).astype(np.float32)
+    new_ms = time_call(extract_features, y, sr, args.rounds)
+    old_ms = time_call(legacy_features, y, sr, args.rounds)
+    print(f"\n{args.seconds:.0f}s clip at {sr} Hz: vectorized {new_ms:.1f} ms, piptrack {old_ms:.1f} ms "
+          f"({old_ms / new_ms:.1f}x)")
+
+    if failures:
+        print("\nRegressions:\n  " + "\n  ".join(failures))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
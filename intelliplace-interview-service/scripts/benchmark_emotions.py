@@ -0,0 +1,81 @@
+"""
+Benchmark batched emotion inference against the per-frame DeepFace loop.
+
+Usage (from intelliplace-interview-service/):
+    python scripts/benchmark_emotions.py --frames-dir path/to/frames [--frames 10] [--rounds 5]
+    python scripts/benchmark_emotions.py --video answer.mp4
+
+Frames should contain faces; frames without one are skipped by the batched
+engine, which would flatter its numbers.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.emotion_engine import EmotionEngine  # noqa: E402
+
+
+def load_frames(args):
+    if args.video:
+        capture = cv2.VideoCapture(args.video)
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or args.frames
+        frames = []
+        for i in range(args.frames):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, i * max(1, total // args.frames))
+            ok, frame = capture.read()
+            if ok:
+                frames.append(frame)
+        return frames
+    paths = sorted(
+        p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(args.frames_dir, f"*.{ext}"))
+    )
+    return [cv2.imread(p) for p in paths[:args.frames]]
+
+
+def legacy_loop(frames):
+    """The previous implementation: one DeepFace.analyze call per frame."""
+    from deepface import DeepFace
+    for frame in frames:
+        DeepFace.analyze(img_path=frame, actions=['emotion'], enforce_detection=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emotion inference benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--frames-dir", help="Directory of face images")
+    source.add_argument("--video", help="Video file to sample frames from")
+    parser.add_argument("--frames", type=int, default=10, help="Frames per request")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed repetitions")
+    args = parser.parse_args()
+
+    frames = [f for f in load_frames(args) if f is not None]
+    if not frames:
+        sys.exit("No frames loaded")
+
+    engine = EmotionEngine()
+    start = time.perf_counter()
+    if not engine.load():
+        sys.exit(f"Emotion model unavailable: {engine.load_error}")
+    print(f"Model load: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Warm both paths once so model construction is not timed
+    legacy_loop(frames[:1])
+    result = engine.analyze(frames)
+    print(f"Faces found: {result['frames_analyzed']}/{len(frames)} frames")
+
+    for label, fn in (("per-frame DeepFace.analyze", legacy_loop), ("batched EmotionEngine", engine.analyze)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            fn(frames)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28}{len(frames) * args.rounds / elapsed:>10.1f} frames/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare peak memory of the JSON/base64 and multipart forms of /analyze-answer.
+
+Usage (from intelliplace-interview-service/):
+    python scripts/benchmark_upload_memory.py [--seconds 60] [--frames 60]
+
+A synthetic 48 kHz WAV answer and JPEG frames are sent both ways through
+request parsing, audio decoding and keyframe selection (the ingest half of
+the endpoint; STT, DeepFace and Gemini are not called). Peak memory is the
+tracemalloc peak, which includes NumPy buffers, measured from the moment the
+request body is handed to Flask.
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("PRELOAD_FEATURES", "audio_decoding")
+
+import app as service  # noqa: E402
+from services.frame_sampler import select_keyframes  # noqa: E402
+
+QUESTION = "Explain the difference between a process and a thread."
+
+
+def synthetic_wav(seconds, rate=48000):
+    t = np.arange(int(seconds * rate)) / rate
+    y = 0.2 * np.sin(2 * np.pi * 180 * t) * (1 + np.sin(2 * np.pi * 0.5 * t)) / 2
+    buffer = io.BytesIO()
+    sf.write(buffer, y.astype(np.float32), rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def synthetic_frames(count, width=640, height=480):
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        image = np.full((height, width, 3), 40 + (i * 3) % 160, dtype=np.uint8)
+        image += rng.integers(0, 30, image.shape, dtype=np.uint8)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def ingest():
+    """The request-side work of /analyze-answer up to the analysis stages."""
+    args, _ = service.parse_answer_request()
+    clip = service.audio_feature.get().decode_audio(args[2])
+    images, _ = select_keyframes(args[3], budget=service.FRAME_BUDGET)
+    return clip, images
+
+
+def measure(label, context_kwargs, body_bytes):
+    ctx = service.app.test_request_context("/analyze-answer", method="POST", **context_kwargs)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    with ctx:
+        clip, images = ingest()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<12}{body_bytes / 1e6:>12.1f}{peak / 1e6:>12.1f}{elapsed:>10.0f}"
+        f"{clip.duration:>10.1f}{len(images):>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60, help="Answer length")
+    parser.add_argument("--frames", type=int, default=60, help="Video frames sent")
+    args = parser.parse_args()
+
+    wav = synthetic_wav(args.seconds)
+    frames = synthetic_frames(args.frames)
+
+    json_body = json.dumps({
+        "question": QUESTION,
+        "audio_data": base64.b64encode(wav).decode("ascii"),
+        "video_frames": [base64.b64encode(f).decode("ascii") for f in frames],
+    }).encode("utf-8")
+    multipart = {
+        "question": QUESTION,
+        "audio": (io.BytesIO(wav), "answer.wav", "audio/wav"),
+        "frames": [(io.BytesIO(f), f"{i}.jpg", "image/jpeg") for i, f in enumerate(frames)],
+    }
+    raw_bytes = len(wav) + sum(len(f) for f in frames)
+
+    # First decode pays librosa's lazy imports; keep it out of both measurements
+    service.audio_feature.get().decode_audio(synthetic_wav(1))
+    select_keyframes(frames[:1])
+
+    print(f"audio {len(wav) / 1e6:.1f} MB, {len(frames)} frames {sum(map(len, frames)) / 1e6:.1f} MB\n")
+    print(f"{'form':<12}{'body MB':>12}{'peak MB':>12}{'ms':>10}{'audio s':>10}{'frames':>8}")
+    measure("json/base64", {"data": json_body, "content_type": "application/json"}, len(json_body))
+    measure("multipart", {"data": multipart, "content_type": "multipart/form-data"}, raw_bytes)
+
+
+if __name__ == "__main__":
+    main()
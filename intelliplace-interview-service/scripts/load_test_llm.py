@@ -0,0 +1,83 @@
+"""
+Offline load test of the LLM path with the fake backend.
+
+Usage (from intelliplace-interview-service/):
+    python scripts/load_test_llm.py [--requests 200] [--clients 32] [--latency-ms 800] [--error-rate 0.1]
+
+Concurrent clients call /generate-question and grade answers through the
+Flask test client with LLM_BACKEND=fake, so no Gemini key or quota is needed.
+Every request uses a distinct prompt (the response cache is not exercised).
+Reports request latency, how many requests fell back (5.0 default score or a
+503), and the LLM client's retry, timeout and circuit-breaker counters.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (half questions, half grading)")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Fake backend latency")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Fake backend failure rate (0-1)")
+    args = parser.parse_args()
+
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["LLM_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LLM_FAKE_ERROR_RATE"] = str(args.error_rate)
+    os.environ.setdefault("PRELOAD_FEATURES", "none")
+    import app as service
+
+    client = service.app.test_client()
+
+    def question(i):
+        response = client.post("/generate-question", json={
+            "mode": "TECH",
+            "job_title": "Backend Engineer",
+            "job_description": f"Load test opening {i}",
+            "required_skills": ["python", "sql"],
+        })
+        return response.status_code == 200
+
+    def grading(i):
+        result = service.grade_answer_content(f"Load test question {i}", "An answer.", "TECH")
+        return not result["feedback"].startswith("Error in grading")
+
+    def run(i):
+        started = time.perf_counter()
+        ok = (question if i % 2 == 0 else grading)(i)
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(run, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for ms, _ in results]
+    fallbacks = sum(1 for _, ok in results if not ok)
+    print(f"{args.requests} requests, {args.clients} clients, fake latency {args.latency_ms:.0f} ms, "
+          f"error rate {args.error_rate:.0%}")
+    print(f"  throughput   {args.requests / elapsed:.1f} req/s")
+    print(f"  latency ms   p50 {percentile(latencies, 0.5):.0f}  p95 {percentile(latencies, 0.95):.0f}  "
+          f"max {max(latencies):.0f}")
+    print(f"  fell back    {fallbacks} ({fallbacks / args.requests:.0%})")
+    stats = service.llm_client.stats()
+    print("  llm client   " + ", ".join(
+        f"{key} {stats[key]}" for key in
+        ("calls", "succeeded", "failed", "retries", "timeouts", "rejected", "breaker_opened", "breaker_state")
+    ))
+    print(f"  llm latency  {stats['latency_ms']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Profile interview-service startup: import time, wall time and peak RSS.
+
+Usage (from intelliplace-interview-service/):
+    python scripts/profile_startup.py [--preload none,all] [--top 15] [--max-seconds 5]
+
+Each PRELOAD_FEATURES setting imports `app` in a fresh interpreter under
+`python -X importtime` and reports the slowest top-level imports. With
+--max-seconds the script exits non-zero when the `none` (question-only)
+startup is slower than that, so it can guard against heavy imports creeping
+back into module load.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run inside the child: import the app, then print wall time and peak RSS
+PROBE = """
+import resource, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == 'darwin' else 1024
+print(f"STARTUP {elapsed:.3f} {rss * scale / 1e6:.1f}")
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Import time in microseconds per top-level package, from -X importtime
+    output. Self times are summed, so nested imports are not counted twice.
+    """
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|")
+            self_us = int(self_us)
+        except ValueError:
+            continue  # header line
+        totals[name.strip().split(".")[0]] += self_us
+    return totals
+
+
+def profile(preload):
+    env = dict(os.environ, PRELOAD_FEATURES=preload)
+    env.setdefault("GEMINI_API_KEY", "profile-startup")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True
+    )
+    summary = [line for line in proc.stdout.splitlines() if line.startswith("STARTUP ")]
+    if proc.returncode != 0 or not summary:
+        raise RuntimeError(f"import app failed with PRELOAD_FEATURES={preload}:\n{proc.stderr[-2000:]}")
+    _, seconds, rss_mb = summary[-1].split()
+    return float(seconds), float(rss_mb), parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preload", default="none,all", help="PRELOAD_FEATURES values to compare")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-seconds", type=float, help="Fail if PRELOAD_FEATURES=none startup exceeds this")
+    args = parser.parse_args()
+
+    failed = False
+    for preload in [p.strip() for p in args.preload.split(",") if p.strip()]:
+        seconds, rss_mb, imports = profile(preload)
+        print(f"PRELOAD_FEATURES={preload}: {seconds:.2f} s to import app, peak RSS {rss_mb:.0f} MB")
+        for name, micros in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {micros / 1000:>10.1f} ms  {name}")
+        print()
+        if preload == "none" and args.max_seconds is not None and seconds > args.max_seconds:
+            print(f"Startup regression: {seconds:.2f} s > {args.max_seconds:.2f} s")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
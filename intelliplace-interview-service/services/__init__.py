@@ -0,0 +1 @@
+# Interview Services
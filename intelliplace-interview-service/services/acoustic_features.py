@@ -0,0 +1,159 @@
+"""
+Acoustic confidence features for answer audio.
+Energy, zero-crossing rate and pitch come from one frame grid over the
+analysis-rate waveform: frame energy and crossing counts are read off running
+sums (no per-frame copies), and a vectorized YIN estimator runs on a
+decimated view of the voiced frames only.
+"""
+import numpy as np
+
+# Same framing as librosa's rms / zero_crossing_rate defaults
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+# Pitch is estimated on a decimated copy of the frames; 8 kHz still resolves
+# every harmonic that matters for a 60-500 Hz fundamental
+PITCH_SAMPLE_RATE = 8000
+PITCH_FMIN = 60.0
+PITCH_FMAX = 500.0
+YIN_THRESHOLD = 0.1
+# Frames quieter than this fraction of the loudest frame are treated as unvoiced
+VOICED_ENERGY_RATIO = 0.1
+VOICED_MIN_RMS = 1e-4
+VOICED_MAX_ZCR = 0.25
+# Voiced frames per YIN batch, bounds the FFT working set
+PITCH_CHUNK = 256
+# The confidence score was tuned on librosa piptrack's pitch, an average over
+# the harmonic peaks that comes out at roughly 3-6x the fundamental on voiced
+# speech. Scaling the fundamental by this factor keeps scores comparable
+# (fitted on 5-12 harmonic tones with noise, 100-260 Hz; see
+# scripts/benchmark_audio_features.py --check).
+PITCH_SCORE_F0_SCALE = 4.5
+
+
+class FrameGrid:
+    """Centered, zero-padded frames over a waveform with per-frame RMS and ZCR."""
+
+    def __init__(self, samples, sample_rate, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+        y = np.asarray(samples, dtype=np.float32)
+        pad = frame_length // 2
+        padded = np.pad(y, (pad, pad + max(0, frame_length - len(y) - 2 * pad)))
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.padded = padded
+        self.frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop_length]
+        starts = np.arange(len(self.frames)) * hop_length
+        ends = starts + frame_length
+
+        power = np.concatenate(([0.0], np.cumsum(padded.astype(np.float64) ** 2)))
+        self.rms = np.sqrt(np.maximum(power[ends] - power[starts], 0.0) / frame_length)
+
+        # A crossing at sample k means the sign changed between k-1 and k;
+        # like librosa, the first sample of a frame never counts.
+        positive = padded > -1e-10
+        crossings = np.concatenate(([0], np.cumsum(positive[1:] != positive[:-1])))
+        self.zcr = (crossings[ends - 1] - crossings[starts]) / frame_length
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def times(self):
+        """Frame centre times in seconds of the original (unpadded) signal."""
+        return np.arange(len(self.frames)) * self.hop_length / self.sample_rate
+
+    def decimated_frames(self, factor):
+        """
+        The same frame grid over a copy low-passed with a [1, 2, 1] kernel and
+        decimated by `factor` (frames stay aligned with the full-rate ones).
+        """
+        if factor <= 1:
+            return self.frames
+        smoothed = np.convolve(self.padded, np.array([0.25, 0.5, 0.25], dtype=np.float32), mode="same")
+        decimated = smoothed[::factor]
+        frame_length = self.frame_length // factor
+        return np.lib.stride_tricks.sliding_window_view(decimated, frame_length)[::self.hop_length // factor][:len(self.frames)]
+
+    def voiced_mask(self):
+        floor = max(VOICED_ENERGY_RATIO * float(self.rms.max(initial=0.0)), VOICED_MIN_RMS)
+        return (self.rms > floor) & (self.zcr < VOICED_MAX_ZCR)
+
+
+def yin_pitch(frames, sample_rate, fmin=PITCH_FMIN, fmax=PITCH_FMAX, threshold=YIN_THRESHOLD):
+    """
+    Fundamental frequency (Hz) per frame with the YIN estimator, 0 where the
+    frame has no clear periodicity. Frames are rows of a 2-D array.
+    """
+    tau_min = max(2, int(sample_rate / fmax))
+    tau_max = int(np.ceil(sample_rate / fmin))
+    # Lags up to tau_max + 1 (for the trough test) over a window of tau_max samples
+    width = 2 * tau_max + 2
+    if len(frames) == 0 or frames.shape[1] < width:
+        return np.zeros(len(frames))
+    window = width - tau_max - 1
+    # Analyse the middle of each frame, away from the zero padding at the edges
+    offset = (frames.shape[1] - width) // 2
+    x = np.asarray(frames[:, offset:offset + width], dtype=np.float64)
+    n_fft = 1 << int(np.ceil(np.log2(width + window)))
+
+    # Autocorrelation of the first `window` samples against every lag
+    acf = np.fft.irfft(
+        np.fft.rfft(x, n_fft, axis=1) * np.conj(np.fft.rfft(x[:, :window], n_fft, axis=1)),
+        n_fft, axis=1
+    )[:, :tau_max + 2]
+    power = np.concatenate((np.zeros((len(x), 1)), np.cumsum(x ** 2, axis=1)), axis=1)
+    lags = np.arange(tau_max + 2)
+    energy = power[:, lags + window] - power[:, lags]
+    diff = np.maximum(energy[:, :1] + energy - 2 * acf, 0.0)
+
+    # Cumulative mean normalized difference
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(np.cumsum(diff[:, 1:], axis=1), 1e-12)
+
+    # First dip below the threshold that is a local minimum
+    mid = cmnd[:, tau_min:tau_max + 1]
+    trough = (mid < threshold) & (mid <= cmnd[:, tau_min - 1:tau_max]) & (mid <= cmnd[:, tau_min + 1:tau_max + 2])
+    found = trough.any(axis=1) & (energy[:, 0] > window * VOICED_MIN_RMS ** 2)
+    tau = tau_min + np.argmax(trough, axis=1)
+
+    # Parabolic interpolation around the dip
+    rows = np.arange(len(x))
+    a, b, c = cmnd[rows, tau - 1], cmnd[rows, tau], cmnd[rows, tau + 1]
+    curvature = a - 2 * b + c
+    shift = np.where(curvature > 0, 0.5 * (a - c) / np.where(curvature > 0, curvature, 1.0), 0.0)
+    period = tau + np.clip(shift, -1.0, 1.0)
+    return np.where(found, sample_rate / period, 0.0)
+
+
+def extract_features(samples, sample_rate, grid=None):
+    """
+    Mean pitch (Hz, over voiced frames with a detected period; 0 if none),
+    mean RMS energy and mean zero-crossing rate of a mono waveform.
+    """
+    if grid is None:
+        grid = FrameGrid(samples, sample_rate)
+    voiced = np.flatnonzero(grid.voiced_mask())
+    factor = max(1, sample_rate // PITCH_SAMPLE_RATE)
+    frames = grid.decimated_frames(factor)
+    pitches = [
+        yin_pitch(frames[voiced[i:i + PITCH_CHUNK]], sample_rate / factor)
+        for i in range(0, len(voiced), PITCH_CHUNK)
+    ]
+    pitches = np.concatenate(pitches) if pitches else np.zeros(0)
+    pitches = pitches[pitches > 0]
+    return {
+        "pitch_mean": float(pitches.mean()) if len(pitches) else 0.0,
+        "energy_mean": float(grid.rms.mean()) if len(grid) else 0.0,
+        "zcr_mean": float(grid.zcr.mean()) if len(grid) else 0.0,
+        "voiced_frames": int(len(voiced)),
+    }
+
+
+def confidence_score(features):
+    """0-10 confidence from pitch, energy and ZCR, as returned by extract_features."""
+    pitch_mean, energy_mean, zcr_mean = features["pitch_mean"], features["energy_mean"], features["zcr_mean"]
+    pitch_score = min(10, (pitch_mean * PITCH_SCORE_F0_SCALE / 200) * 3) if pitch_mean > 0 else 5
+    energy_score = min(10, (energy_mean / 0.1) * 5) if energy_mean > 0 else 5
+    zcr_score = max(0, 10 - (zcr_mean * 100))
+    return (pitch_score + energy_score + zcr_score) / 3
@@ -0,0 +1,85 @@
+"""
+Helpers for grading many answers in one LLM call.
+Answers are packed into chunks that fit a token budget, and the model's
+reply is parsed leniently: code fences and surrounding prose are ignored, and
+each grade is validated on its own, so one malformed entry costs only that
+answer (which the caller grades separately) rather than the whole batch.
+"""
+import json
+import re
+
+from services.interview_sessions import estimate_tokens
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def chunk_answers(items, token_budget):
+    """
+    Split `items` ({"index", "question", "answer"} dicts) into consecutive
+    chunks whose question and answer text fits `token_budget`. An item larger
+    than the budget gets a chunk of its own.
+    """
+    chunks, current, used = [], [], 0
+    for item in items:
+        cost = estimate_tokens(item["question"]) + estimate_tokens(item["answer"])
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _load_json(text):
+    text = (text or "").strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    # Prose around the JSON: try the outermost object, then the outermost array
+    for start, end in (("{", "}"), ("[", "]")):
+        first, last = text.find(start), text.rfind(end)
+        if first != -1 and last > first:
+            try:
+                return json.loads(text[first:last + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def parse_batch_grades(text, indices):
+    """
+    {index: {"content_score", "feedback"}} for every answer in `indices` the
+    response graded validly; missing or malformed entries are left out.
+    Entries without an "index" are matched by position when the counts agree.
+    """
+    data = _load_json(text)
+    if isinstance(data, dict):
+        data = data.get("grades")
+    if not isinstance(data, list):
+        return {}
+
+    wanted = set(indices)
+    positional = len(data) == len(indices)
+    grades = {}
+    for position, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index")
+        try:
+            index = int(index) if index is not None else (indices[position] if positional else None)
+            score = float(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if index not in wanted or index in grades or score != score:
+            continue
+        grades[index] = {
+            "content_score": round(min(10.0, max(0.0, score)), 1),
+            "feedback": str(entry.get("feedback") or "No feedback provided"),
+        }
+    return grades
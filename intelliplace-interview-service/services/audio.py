@@ -0,0 +1,62 @@
+"""
+Audio ingest for answer analysis.
+The upload (base64 from a JSON body, or raw bytes / a file part from a
+multipart request) is decoded once, in memory, into a mono float32 waveform at
+a fixed analysis rate; every stage (speech-to-text, acoustic features) reads
+that same array. Nothing touches the filesystem.
+"""
+import base64
+import io
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+ANALYSIS_SAMPLE_RATE = 16000
+
+
+class AudioClip:
+    """Mono float32 waveform shared read-only across analysis stages."""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        samples.setflags(write=False)
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def to_pcm16(self) -> bytes:
+        """16-bit little-endian PCM, as expected by speech_recognition.AudioData."""
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+def decode_audio(audio_data, sample_rate=ANALYSIS_SAMPLE_RATE) -> AudioClip:
+    """
+    Decode WAV/FLAC/OGG audio to a mono clip resampled once to `sample_rate`.
+
+    `audio_data` is a base64 string, raw bytes, or a binary file-like object
+    (read directly, without an intermediate copy).
+    """
+    if isinstance(audio_data, str):
+        source = io.BytesIO(base64.b64decode(audio_data))
+    elif isinstance(audio_data, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(audio_data)
+    else:
+        source = audio_data
+    samples, native_rate = sf.read(source, dtype='float32', always_2d=True)
+    samples = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    if native_rate != sample_rate:
+        samples = librosa.resample(samples, orig_sr=native_rate, target_sr=sample_rate)
+    return AudioClip(np.ascontiguousarray(samples, dtype=np.float32), sample_rate)
+
+
+def warm_up():
+    """
+    Decode and resample a tenth of a second of 48 kHz silence. librosa loads
+    its resampler lazily, which otherwise costs the first request seconds.
+    """
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(4800, dtype=np.float32), 48000, format='WAV', subtype='PCM_16')
+    return decode_audio(buffer.getvalue())
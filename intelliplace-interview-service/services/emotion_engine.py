@@ -0,0 +1,139 @@
+"""
+Batched facial-emotion inference for interview video frames.
+The face detector and DeepFace's emotion model are loaded once per process;
+all face crops of a request are stacked into a single forward pass, and
+frames without a detected face are skipped before classification.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+EMOTION_INPUT_SIZE = 48
+
+
+class EmotionEngine:
+    def __init__(self, detection_width=320):
+        """detection_width: frames are downscaled to this width for face detection."""
+        self.detection_width = detection_width
+        self._deepface = None
+        self._cascade_path = None
+        # CascadeClassifier keeps per-image evaluator state and is not
+        # thread-safe, so every thread detecting faces gets its own
+        self._local = threading.local()
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+        self.load_error = None
+
+    @property
+    def available(self):
+        return self._model is not None
+
+    def import_dependencies(self):
+        """
+        Import DeepFace (and with it TensorFlow) and create the face detector,
+        without building the model; returns True on success. Safe before a
+        fork: TensorFlow starts its thread pools only once a model is built.
+        """
+        with self._load_lock:
+            if self._deepface is not None:
+                return True
+            try:
+                from deepface import DeepFace
+                cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+                if cv2.CascadeClassifier(cascade_path).empty():
+                    raise RuntimeError(f"could not load face detector from {cascade_path}")
+                self._cascade_path = cascade_path
+                self._deepface = DeepFace
+                return True
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"Emotion model load error: {str(e)}")
+                return False
+
+    def load(self):
+        """Build the emotion model once (importing dependencies if needed); returns True when ready."""
+        if self._model is not None:
+            return True
+        if not self.import_dependencies():
+            return False
+        with self._load_lock:
+            if self._model is not None:
+                return True
+            try:
+                built = self._deepface.build_model('Emotion')
+                # Newer DeepFace versions wrap the Keras model in a client object
+                self._model = getattr(built, 'model', built)
+                self.load_error = None
+                return True
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"Emotion model load error: {str(e)}")
+                return False
+
+    def warm_up(self):
+        """Build the model and run one forward pass, so neither happens on the first request."""
+        if self.load():
+            self.predict([np.zeros((EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), dtype=np.float32)])
+
+    def _detector(self):
+        """This thread's face detector."""
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            detector = self._local.detector = cv2.CascadeClassifier(self._cascade_path)
+        return detector
+
+    def face_crop(self, image):
+        """Largest detected face as a normalized 48x48 grayscale array, or None."""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        scale = min(1.0, self.detection_width / float(gray.shape[1]))
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        faces = self._detector().detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        x, y, w, h = (int(round(v / scale)) for v in (x, y, w, h))
+        face = gray[y:y + h, x:x + w]
+        face = cv2.resize(face, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        return face.astype(np.float32) / 255.0
+
+    def predict(self, faces):
+        """Emotion percentages for a stack of 48x48 crops, one row per face."""
+        batch = np.stack(faces)[..., np.newaxis]
+        with self._predict_lock:
+            probabilities = np.asarray(self._model.predict(batch, verbose=0))
+        return 100.0 * probabilities / np.maximum(probabilities.sum(axis=1, keepdims=True), 1e-12)
+
+    def analyze(self, images):
+        """
+        Average emotions over the faces found in `images` (BGR arrays).
+
+        Returns the same shape as the per-frame DeepFace analysis used before:
+        emotions (percent), dominant_emotion and frames_analyzed.
+        """
+        faces = []
+        skipped = 0
+        for image in images:
+            if image is None:
+                skipped += 1
+                continue
+            face = self.face_crop(image)
+            if face is None:
+                skipped += 1
+            else:
+                faces.append(face)
+
+        if not faces:
+            return {"emotions": {}, "dominant_emotion": "neutral", "frames_analyzed": 0, "frames_without_face": skipped}
+
+        mean = self.predict(faces).mean(axis=0)
+        avg_emotions = {label: round(float(v), 2) for label, v in zip(EMOTION_LABELS, mean)}
+        return {
+            "emotions": avg_emotions,
+            "dominant_emotion": max(avg_emotions, key=avg_emotions.get),
+            "frames_analyzed": len(faces),
+            "frames_without_face": skipped
+        }
@@ -0,0 +1,65 @@
+"""
+Lazily loaded feature modules.
+Heavy analysis dependencies (TensorFlow/DeepFace, OpenCV, librosa,
+speech_recognition) are imported the first time their feature is used, or at
+startup for the features listed in PRELOAD_FEATURES, so a process that only
+generates questions never pays for them.
+"""
+import threading
+import time
+
+
+class FeatureUnavailableError(Exception):
+    """Raised when a feature's dependencies could not be loaded."""
+
+
+class LazyFeature:
+    def __init__(self, name, loader):
+        """loader: zero-argument callable doing the imports; its return value is cached."""
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.error = None
+        self.load_ms = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def available(self):
+        """True once loaded, False if loading failed, None if not tried yet."""
+        if self._loaded:
+            return self.error is None
+        return None
+
+    def load(self):
+        """Load once (thread-safe); returns True if the feature is usable."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    started = time.perf_counter()
+                    try:
+                        self._value = self._loader()
+                    except Exception as e:
+                        self.error = str(e)
+                        print(f"Warning: {self.name} unavailable - {str(e)}")
+                    self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+                    self._loaded = True
+        return self.error is None
+
+    def get(self):
+        if not self.load():
+            raise FeatureUnavailableError(f"{self.name} unavailable: {self.error}")
+        return self._value
+
+    def stats(self):
+        return {
+            "loaded": self._loaded,
+            "available": self.available,
+            "load_ms": self.load_ms,
+            "error": self.error,
+        }
+
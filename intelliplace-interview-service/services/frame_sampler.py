@@ -0,0 +1,80 @@
+"""
+Keyframe selection for interview video frames.
+Picks a fixed budget of frames spread over the whole answer and drops
+near-duplicates using a difference hash computed on a cheap reduced-size
+decode, so only the selected frames are ever decoded at full resolution.
+"""
+import base64
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8
+# Candidates examined per selected frame; extra candidates give the
+# de-duplication step something to choose from.
+OVERSAMPLE = 3
+
+
+def spread_indices(count, budget):
+    """Up to `budget` indices spread evenly over range(count)."""
+    if count <= budget:
+        return list(range(count))
+    return sorted(set(np.linspace(0, count - 1, budget).round().astype(int).tolist()))
+
+
+def dhash(gray):
+    """64-bit difference hash of a grayscale image, as a boolean array."""
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    return (small[:, 1:] > small[:, :-1]).flatten()
+
+
+def frame_buffer(frame):
+    """Encoded image bytes of a frame given as base64, raw bytes or a file part."""
+    if isinstance(frame, str):
+        data = base64.b64decode(frame)
+    elif hasattr(frame, "read"):
+        data = frame.read()
+    else:
+        data = frame
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def select_keyframes(frames, budget=10, min_distance=5):
+    """
+    Choose up to `budget` distinct frames covering the whole answer.
+
+    Frames are base64 strings, raw bytes or binary file-like objects; only
+    the candidates considered are ever read.
+
+    Returns (images, stats): full-resolution BGR arrays for the selected
+    frames, in time order, and counters describing the selection.
+    """
+    stats = {"frames_received": len(frames)}
+    candidates = spread_indices(len(frames), budget * OVERSAMPLE)
+    stats["frames_considered"] = len(candidates)
+
+    kept = []
+    last_hash = None
+    duplicates = 0
+    for index in candidates:
+        try:
+            buffer = frame_buffer(frames[index])
+            # JPEG decodes at 1/8 scale directly from the DCT coefficients
+            preview = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        except Exception as e:
+            print(f"Frame decode error: {str(e)}")
+            continue
+        if preview is None:
+            continue
+        frame_hash = dhash(preview)
+        if last_hash is not None and np.count_nonzero(frame_hash != last_hash) < min_distance:
+            duplicates += 1
+            continue
+        last_hash = frame_hash
+        kept.append(buffer)
+    stats["duplicates_dropped"] = duplicates
+
+    selected = [kept[i] for i in spread_indices(len(kept), budget)]
+    images = [cv2.imdecode(buffer, cv2.IMREAD_COLOR) for buffer in selected]
+    stats["frames_selected"] = len(images)
+    return images, stats
@@ -0,0 +1,190 @@
+"""
+Interview sessions kept by the service, keyed by session id.
+A session holds the job and candidate context once, plus the turns asked so
+far; clients then send only the newest answer. The most recent turns stay
+verbatim and older ones are folded into a compact rolling summary, so the
+history part of a question prompt stays within a fixed token budget however
+long the interview runs.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Rough token estimate for English prompt text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def _clip(text, max_chars):
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+CONTEXT_FIELDS = (
+    "mode", "job_title", "job_description", "required_skills",
+    "candidate_skills", "candidate_profile", "resume_excerpt",
+)
+
+
+class InterviewSession:
+    def __init__(self, session_id, context, turns=None, summary_lines=None, folded_turns=0, updated_at=None):
+        """
+        context: the CONTEXT_FIELDS sent when the session was created.
+        turns: recent {"question", "answer"} dicts, oldest first; the last
+        one has answer None while it waits for the candidate.
+        """
+        self.session_id = session_id
+        self.context = {key: context.get(key) for key in CONTEXT_FIELDS}
+        self.turns = list(turns or [])
+        self.summary_lines = list(summary_lines or [])
+        self.folded_turns = folded_turns
+        self.updated_at = updated_at or time.time()
+
+    @property
+    def question_count(self):
+        return self.folded_turns + len(self.turns)
+
+    @property
+    def summary(self):
+        return "\n".join(self.summary_lines)
+
+    def record_answer(self, answer):
+        """Attach the candidate's answer to the question waiting for one."""
+        if self.turns and self.turns[-1].get("answer") is None:
+            # Whitespace-normalised, so a transcript and the same text echoed
+            # back by a client produce identical prompts
+            self.turns[-1]["answer"] = " ".join(str(answer).split())
+
+    def add_question(self, question):
+        self.turns.append({"question": question, "answer": None})
+        self.updated_at = time.time()
+
+    def history_tokens(self):
+        turns = "\n\n".join(f"Q: {t['question']}\nA: {t.get('answer') or ''}" for t in self.turns)
+        return estimate_tokens(turns) + estimate_tokens(self.summary)
+
+    def fold(self, token_budget, summary_share=0.4):
+        """
+        Fold the oldest turns into the summary until turns plus summary fit
+        `token_budget`; the summary itself is kept to `summary_share` of it.
+        The newest turn always stays verbatim.
+        """
+        while len(self.turns) > 1 and self.history_tokens() > token_budget:
+            turn = self.turns.pop(0)
+            self.folded_turns += 1
+            line = f"- Q{self.folded_turns}: {_clip(turn['question'], 160)}"
+            if turn.get("answer"):
+                line += f" | A: {_clip(turn['answer'], 240)}"
+            self.summary_lines.append(line)
+
+        summary_budget = int(token_budget * summary_share)
+        # Older summary lines shrink to their question first, then drop out
+        index = 0
+        while estimate_tokens(self.summary) > summary_budget and index < len(self.summary_lines):
+            self.summary_lines[index] = self.summary_lines[index].split(" | A: ")[0]
+            index += 1
+        while estimate_tokens(self.summary) > summary_budget and len(self.summary_lines) > 1:
+            self.summary_lines.pop(0)
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "context": self.context,
+            "turns": self.turns,
+            "summary_lines": self.summary_lines,
+            "folded_turns": self.folded_turns,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["session_id"], data["context"], data.get("turns"),
+            data.get("summary_lines"), data.get("folded_turns", 0), data.get("updated_at")
+        )
+
+
+class SessionStore:
+    def __init__(self, max_sessions=1000, ttl_seconds=6 * 3600, db_path=None):
+        """
+        Sessions idle for `ttl_seconds` expire. With `db_path` they are kept
+        in SQLite so every server process sees the same sessions; otherwise
+        up to `max_sessions` are kept in memory (least recently used dropped).
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if db_path:
+            conn = sqlite3.connect(db_path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, updated_at REAL, record TEXT NOT NULL)"
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _connect(self):
+        # One connection per thread and process; never reuse one across a fork
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def get(self, session_id):
+        cutoff = time.time() - self.ttl_seconds
+        if self.db_path:
+            row = self._connect().execute(
+                "SELECT record FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, cutoff)
+            ).fetchone()
+            return InterviewSession.from_dict(json.loads(row[0])) if row else None
+        with self._lock:
+            data = self._sessions.get(session_id)
+            if data is None or data["updated_at"] < cutoff:
+                return None
+            self._sessions.move_to_end(session_id)
+            # A copy, so concurrent requests never share a mutable session
+            return InterviewSession.from_dict(json.loads(json.dumps(data)))
+
+    def put(self, session):
+        session.updated_at = time.time()
+        data = session.to_dict()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, updated_at, record) VALUES (?, ?, ?)",
+                    (session.session_id, session.updated_at, json.dumps(data))
+                )
+                conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+            return
+        with self._lock:
+            self._sessions[session.session_id] = data
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        if self.db_path:
+            with self._connect() as conn:
+                return conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        if self.db_path:
+            count = self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        else:
+            count = len(self._sessions)
+        return {"sessions": count, "persistent": bool(self.db_path), "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,325 @@
+"""
+Job queue for long-running answer analysis.
+Submitting returns a job id immediately; a bounded pool of workers runs the
+jobs, results are kept for polling until they expire, and an optional
+callback URL (on an allow-listed host) receives the finished job. When queued
+plus running jobs reach the limit, new submissions are rejected so the caller
+can retry later. Job records live in memory, or in SQLite when several server
+processes must answer polls for each other's jobs. Unfinished jobs carry a
+heartbeat from their process; one that stops (the worker was recycled or
+killed) marks its jobs failed once their heartbeat goes stale.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the queue has no room for more jobs."""
+
+    def __init__(self, retry_after):
+        super().__init__("Analysis queue is full")
+        self.retry_after = retry_after
+
+
+class MemoryJobStore:
+    """Job records in this process only."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def heartbeat(self, job_ids, at):
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is not None and job["finished_at"] is None:
+                    job["heartbeat_at"] = at
+
+    def expire(self, cutoff):
+        with self._lock:
+            for job_id in [k for k, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+    def stale(self, cutoff):
+        """Unfinished jobs whose heartbeat is older than `cutoff`."""
+        with self._lock:
+            return [
+                dict(job) for job in self._jobs.values()
+                if job["finished_at"] is None and (job.get("heartbeat_at") or 0) < cutoff
+            ]
+
+    def count(self):
+        return len(self._jobs)
+
+
+class SqliteJobStore:
+    """Job records in a SQLite file shared by all server processes on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, finished_at REAL, heartbeat_at REAL, record TEXT NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # One connection per thread and process; never reuse one across a fork
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.conn = sqlite3.connect(self.path, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def put(self, job):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, finished_at, heartbeat_at, record) VALUES (?, ?, ?, ?)",
+                (job["job_id"], job["finished_at"], job.get("heartbeat_at"), json.dumps(job))
+            )
+
+    def heartbeat(self, job_ids, at):
+        """Refresh the heartbeat of the given unfinished jobs."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET heartbeat_at = ?, "
+                "record = json_set(record, '$.heartbeat_at', ?) WHERE job_id = ? AND finished_at IS NULL",
+                [(at, at, job_id) for job_id in job_ids]
+            )
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def expire(self, cutoff):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+
+    def stale(self, cutoff):
+        rows = self._connect().execute(
+            "SELECT record FROM jobs WHERE finished_at IS NULL AND COALESCE(heartbeat_at, 0) < ?", (cutoff,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+class JobQueue:
+    def __init__(self, workers=4, max_pending=64, ttl_seconds=3600, retry_after=5, callback_timeout=10,
+                 store=None, callback_hosts=(), heartbeat_seconds=15):
+        """
+        workers: jobs processed concurrently.
+        max_pending: cap on queued plus running jobs in this process.
+        ttl_seconds: how long finished jobs stay available for polling.
+        store: MemoryJobStore (default) or SqliteJobStore.
+        callback_hosts: hosts ("host" or "host:port") callback URLs may point at;
+            empty rejects every callback URL.
+        heartbeat_seconds: how often unfinished jobs are marked alive; after
+            four missed heartbeats a job is failed as abandoned.
+        """
+        self.store = store or MemoryJobStore()
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.retry_after = retry_after
+        self.callback_timeout = callback_timeout
+        self.callback_hosts = {h.strip().lower() for h in callback_hosts if h.strip()}
+        self.heartbeat_seconds = heartbeat_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis-job')
+        self._pending = 0
+        self._active = set()
+        self._heartbeat_pid = None
+        self._lock = threading.Lock()
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.abandoned = 0
+
+    def check_callback_url(self, callback_url):
+        """Raise ValueError unless `callback_url` is http(s) on an allowed host."""
+        parts = urllib.parse.urlsplit(str(callback_url))
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("callback_url must be an http(s) URL")
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+        except ValueError:
+            raise ValueError("callback_url has an invalid port")
+        host = parts.hostname.lower()
+        if host not in self.callback_hosts and f"{host}:{port}" not in self.callback_hosts:
+            raise ValueError(f"callback_url host {host} is not allowed")
+
+    def submit(self, fn, *args, callback_url=None):
+        """
+        Queue fn(*args); returns the job id. Raises ValueError for a callback
+        URL that is not allowed and QueueFullError when the queue is full.
+        """
+        if callback_url:
+            self.check_callback_url(callback_url)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(self.retry_after)
+            self._pending += 1
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "owner": self.owner,
+            "created_at": now,
+            "heartbeat_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self.store.expire(now - self.ttl_seconds)
+            self.fail_abandoned()
+            self.store.put(job)
+            with self._lock:
+                self._active.add(job["job_id"])
+            self._start_heartbeat()
+            self._executor.submit(self._run, job, fn, args, callback_url)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(job["job_id"])
+            raise
+        return job["job_id"]
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if unknown or expired."""
+        job = self.store.get(job_id)
+        if job is not None and self._abandoned(job):
+            self._fail_abandoned_job(job)
+        return job
+
+    # Heartbeats and abandoned jobs
+
+    def _abandoned(self, job):
+        return (
+            job["finished_at"] is None
+            and (job.get("heartbeat_at") or 0) < time.time() - 4 * self.heartbeat_seconds
+        )
+
+    def _fail_abandoned_job(self, job):
+        job.update(
+            status=FAILED, finished_at=time.time(),
+            error="Abandoned: the worker running this job exited before it finished"
+        )
+        self.store.put(job)
+        with self._lock:
+            self.abandoned += 1
+
+    def fail_abandoned(self):
+        """Mark failed every unfinished job whose process stopped sending heartbeats."""
+        for job in self.store.stale(time.time() - 4 * self.heartbeat_seconds):
+            self._fail_abandoned_job(job)
+
+    def _start_heartbeat(self):
+        # Started on first use in each process: a thread started in the
+        # gunicorn master would not survive the fork
+        with self._lock:
+            if self._heartbeat_pid == os.getpid():
+                return
+            self._heartbeat_pid = os.getpid()
+        threading.Thread(target=self._heartbeat_loop, name="analysis-job-heartbeat", daemon=True).start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                self.store.heartbeat(active, time.time())
+            except Exception as e:
+                print(f"Analysis job heartbeat failed: {str(e)}")
+
+    def _run(self, job, fn, args, callback_url):
+        try:
+            job.update(status=RUNNING, started_at=time.time())
+            self.store.put(job)
+            try:
+                job.update(status=DONE, result=fn(*args))
+            except Exception as e:
+                print(f"Analysis job {job['job_id']} failed: {str(e)}")
+                job.update(status=FAILED, error=str(e))
+            job["finished_at"] = time.time()
+            self.store.put(job)
+        except Exception as e:
+            # The store failed; the job still ends, and the callback reports it
+            print(f"Analysis job {job['job_id']} could not be recorded: {str(e)}")
+            if job["status"] != DONE:
+                job.update(status=FAILED, error=job["error"] or str(e))
+            job["finished_at"] = job["finished_at"] or time.time()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(job["job_id"])
+                if job["status"] == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+        if callback_url:
+            self._notify(callback_url, job)
+
+    def _notify(self, callback_url, job):
+        body = json.dumps({"success": job["status"] == DONE, "data": job}).encode("utf-8")
+        req = urllib.request.Request(
+            callback_url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            # No redirects: they could lead off the allowed hosts
+            with _NO_REDIRECTS.open(req, timeout=self.callback_timeout):
+                pass
+        except Exception as e:
+            print(f"Callback to {callback_url} failed: {str(e)}")
+
+    def stats(self):
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "stored": self.store.count(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "abandoned": self.abandoned,
+        }
+
+
+class _RejectRedirects(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f"redirect to {newurl} not followed", headers, fp)
+
+
+_NO_REDIRECTS = urllib.request.build_opener(_RejectRedirects)
@@ -0,0 +1,273 @@
+"""
+Content-addressed cache for LLM responses.
+Responses are keyed by a hash of the model name, prompt type and full prompt
+text, kept in a bounded in-memory LRU and optionally in a directory shared by
+all server processes. Each prompt type has its own TTL (0 disables caching for
+that type), and identical prompts in flight at the same time are sent to the
+model once: later callers wait for the first call's result. The disk tier is
+swept periodically: expired files are removed and, above `disk_max_entries`,
+the files closest to expiry go first.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.text = None
+        self.error = None
+        self.latency_ms = 0.0
+
+
+class LLMCache:
+    def __init__(self, generate, model_name="", max_entries=1024, disk_dir=None, ttls=None, default_ttl=3600,
+                 disk_max_entries=20000, sweep_interval=600):
+        """
+        generate: callable(prompt) -> response text, called on a miss.
+        ttls: {prompt_type: seconds}; types not listed use default_ttl.
+        disk_dir: optional directory for the on-disk tier.
+        disk_max_entries: files kept in disk_dir after a sweep.
+        sweep_interval: seconds between sweeps of disk_dir, started by writes.
+        """
+        self._generate = generate
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+        self.disk_max_entries = disk_max_entries
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._sweeping = False
+        self._disk_entries = None
+        self._disk_evicted = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key(self, prompt, prompt_type):
+        payload = "\0".join((self.model_name, prompt_type, prompt)).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def ttl_for(self, prompt_type):
+        return self.ttls.get(prompt_type, self.default_ttl)
+
+    def generate(self, prompt, prompt_type):
+        """Response text for `prompt`, from the cache when fresh."""
+        key = self.key(prompt, prompt_type)
+        ttl = self.ttl_for(prompt_type)
+
+        with self._lock:
+            counters = self._counters.setdefault(prompt_type, {
+                "hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0, "errors": 0, "saved_ms": 0.0
+            })
+            entry = self._memory_get(key) if ttl > 0 else None
+            if entry is not None:
+                counters["hits"] += 1
+                counters["saved_ms"] += entry["latency_ms"]
+                return entry["text"]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            with self._lock:
+                if flight.error is not None:
+                    counters["errors"] += 1
+                else:
+                    counters["coalesced"] += 1
+                    counters["saved_ms"] += flight.latency_ms
+            if flight.error is not None:
+                raise flight.error
+            return flight.text
+
+        try:
+            entry = self._disk_get(key) if ttl > 0 else None
+            if entry is not None:
+                flight.text, flight.latency_ms = entry["text"], entry["latency_ms"]
+                with self._lock:
+                    self._memory_put(key, entry)
+                    counters["disk_hits"] += 1
+                    counters["saved_ms"] += entry["latency_ms"]
+                return flight.text
+
+            started = time.perf_counter()
+            text = self._generate(prompt)
+            flight.text = text
+            flight.latency_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                counters["misses"] += 1
+            if ttl > 0:
+                entry = {
+                    "text": text,
+                    "expires_at": time.time() + ttl,
+                    "latency_ms": flight.latency_ms,
+                    "prompt_type": prompt_type,
+                }
+                with self._lock:
+                    self._memory_put(key, entry)
+                self._disk_put(key, entry)
+            return text
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, prompt, prompt_type):
+        """Drop a cached response, e.g. one the caller could not parse."""
+        key = self.key(prompt, prompt_type)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    # In-memory tier (callers hold self._lock)
+
+    def _memory_get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # On-disk tier
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _disk_put(self, key, entry):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            # The mtime carries the expiry so sweeps need only stat the files
+            os.utime(tmp, (entry["expires_at"], entry["expires_at"]))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"LLM cache write error: {str(e)}")
+            return
+        with self._lock:
+            if self._sweeping or time.monotonic() - self._last_sweep < self.sweep_interval:
+                return
+            self._sweeping = True
+        threading.Thread(target=self.sweep_disk, name="llm-cache-sweep", daemon=True).start()
+
+    def sweep_disk(self):
+        """
+        Remove expired files from the disk tier, then the ones closest to
+        expiry until at most disk_max_entries remain; returns the number removed.
+        """
+        if not self.disk_dir:
+            return 0
+        now = time.time()
+        removed = 0
+        live = []
+        try:
+            for shard in os.scandir(self.disk_dir):
+                if not shard.is_dir():
+                    continue
+                for f in os.scandir(shard.path):
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue
+                    if not f.name.endswith(".json"):
+                        # Temp file abandoned by a writer that crashed
+                        if st.st_ctime < now - 3600:
+                            removed += self._remove(f.path)
+                    elif st.st_mtime <= now:
+                        removed += self._remove(f.path)
+                    else:
+                        live.append((st.st_mtime, f.path))
+            live.sort()
+            excess = max(0, len(live) - self.disk_max_entries)
+            for _, path in live[:excess]:
+                removed += self._remove(path)
+            del live[:excess]
+        except OSError as e:
+            print(f"LLM cache sweep error: {str(e)}")
+        finally:
+            with self._lock:
+                self._sweeping = False
+                self._last_sweep = time.monotonic()
+                self._disk_entries = len(live)
+                self._disk_evicted += removed
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def stats(self):
+        with self._lock:
+            by_type = {}
+            for prompt_type, c in self._counters.items():
+                served = c["hits"] + c["disk_hits"] + c["coalesced"]
+                total = served + c["misses"] + c["errors"]
+                by_type[prompt_type] = dict(
+                    c,
+                    saved_ms=round(c["saved_ms"], 1),
+                    hit_rate=round(served / total, 3) if total else 0.0,
+                    ttl_seconds=self.ttl_for(prompt_type),
+                )
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_tier": bool(self.disk_dir),
+                "disk_entries": self._disk_entries,
+                "disk_evicted": self._disk_evicted,
+                "in_flight": len(self._inflight),
+                "by_type": by_type,
+            }
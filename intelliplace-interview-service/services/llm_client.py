@@ -0,0 +1,248 @@
+"""
+Resilient client for LLM calls.
+Every call has a deadline, at most `max_concurrency` calls reach the backend
+at once, transient errors are retried with jittered exponential backoff, and
+a circuit breaker fails calls fast after repeated failures so callers drop to
+their defaults instead of queueing behind a struggling upstream. Backends are
+pluggable: Gemini in production, a local fake for offline load tests.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class LLMUnavailableError(Exception):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM backend unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(TimeoutError):
+    pass
+
+
+class LLMSaturatedError(LLMTimeoutError):
+    """No concurrency slot freed up before the deadline; the upstream was never called."""
+
+
+# Upstream errors worth retrying: quota, overload and network failures.
+# Matched by name and HTTP code so the google.api_core types need not be imported.
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "RetryError",
+}
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_transient(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    return getattr(error, "code", None) in TRANSIENT_STATUS_CODES
+
+
+class GeminiBackend:
+    def __init__(self, api_key, model_name):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.name = f"gemini:{model_name}"
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self._model.generate_content(prompt).text
+
+
+class FakeBackend:
+    """
+    Offline stand-in with configurable latency and failure rate. Grading
+    prompts (those asking for a JSON "score", or "grades" for a batch) get a
+    JSON answer; anything else gets a question. Responses are deterministic
+    per prompt.
+    """
+
+    def __init__(self, latency_ms=800, jitter_ms=200, error_rate=0.0, seed=None):
+        self.name = "fake"
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("fake backend: simulated upstream failure")
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        if '"grades"' in prompt:
+            indices = re.findall(r"^\s*### Answer (\d+)", prompt, re.MULTILINE)
+            return json.dumps({"grades": [
+                {"index": int(i), "score": 4 + (digest + int(i)) % 60 / 10, "feedback": "Simulated feedback."}
+                for i in indices
+            ]})
+        if '"score"' in prompt:
+            return '{"score": %.1f, "feedback": "Simulated feedback from the fake LLM backend."}' % (4 + digest % 60 / 10)
+        return f"Simulated interview question #{digest % 10000}: tell me about a project you are proud of."
+
+
+class LLMClient:
+    def __init__(self, backend, max_concurrency=8, deadline_seconds=25, max_retries=2,
+                 backoff_base=0.5, backoff_max=4.0, breaker_threshold=5, breaker_reset_seconds=30):
+        """
+        deadline_seconds: total time per call, including queueing and retries.
+        breaker_threshold: consecutive calls failed by the upstream (timeouts,
+        429/5xx, network errors) that open the circuit; after
+        breaker_reset_seconds one trial call is let through.
+        """
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        # Calls run on their own threads so a hung upstream request cannot pin
+        # the server thread past its deadline; the semaphore is released only
+        # when the backend call really returns, keeping concurrency bounded.
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._in_flight = 0
+        self._latencies = deque(maxlen=512)
+        self._counters = {
+            "calls": 0, "succeeded": 0, "failed": 0, "errors": 0, "retries": 0,
+            "timeouts": 0, "saturated": 0, "rejected": 0, "breaker_opened": 0,
+        }
+
+    # Circuit breaker
+
+    def _admit(self):
+        with self._lock:
+            self._counters["calls"] += 1
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited >= self.breaker_reset_seconds and not self._trial_in_flight:
+                self._trial_in_flight = True  # half-open: one trial call
+                return
+            self._counters["rejected"] += 1
+            raise LLMUnavailableError(max(1.0, self.breaker_reset_seconds - waited))
+
+    def _record(self, ok):
+        """
+        Outcome of an admitted call. ok=None is a failure that says nothing
+        about upstream health (bad prompt, blocked response, local
+        saturation): it ends a half-open trial without moving the breaker.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+            if ok is None:
+                self._counters["errors"] += 1
+                return
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                self._counters["succeeded"] += 1
+                return
+            self._failures += 1
+            self._counters["failed"] += 1
+            if self._opened_at is not None or self._failures >= self.breaker_threshold:
+                if self._opened_at is None:
+                    self._counters["breaker_opened"] += 1
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.breaker_reset_seconds:
+                return "half_open"
+            return "open"
+
+    # Calls
+
+    def _attempt(self, prompt, deadline):
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise LLMSaturatedError("no LLM slot free before the deadline")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self.backend.generate, prompt)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise LLMTimeoutError("LLM call exceeded its deadline")
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def generate(self, prompt, deadline_seconds=None):
+        """Response text for `prompt`; raises LLMUnavailableError while the circuit is open."""
+        self._admit()
+        started = time.monotonic()
+        deadline = started + (deadline_seconds or self.deadline_seconds)
+        attempt = 0
+        while True:
+            try:
+                text = self._attempt(prompt, deadline)
+            except Exception as e:
+                if isinstance(e, LLMTimeoutError):
+                    with self._lock:
+                        self._counters["saturated" if isinstance(e, LLMSaturatedError) else "timeouts"] += 1
+                # Only upstream trouble (timeouts, 429/5xx, network) counts
+                # towards opening the breaker
+                upstream = is_transient(e) and not isinstance(e, LLMSaturatedError)
+                # Full jitter: sleep anywhere up to the exponential step
+                pause = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if (attempt >= self.max_retries or not upstream
+                        or isinstance(e, LLMTimeoutError) or time.monotonic() + pause >= deadline):
+                    self._record(False if upstream else None)
+                    raise
+                attempt += 1
+                with self._lock:
+                    self._counters["retries"] += 1
+                time.sleep(pause)
+                continue
+            with self._lock:
+                self._latencies.append((time.monotonic() - started) * 1000)
+            self._record(True)
+            return text
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1) if latencies else 0.0
+
+            return dict(
+                self._counters,
+                backend=self.backend.name,
+                breaker_state=state,
+                consecutive_failures=self._failures,
+                in_flight=self._in_flight,
+                max_concurrency=self.max_concurrency,
+                latency_ms={"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+            )
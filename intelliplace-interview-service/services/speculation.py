@@ -0,0 +1,124 @@
+"""
+Speculative generation of the next interview question.
+As soon as an answer's transcript is known, the prompt for the following
+question is built and sent to the model in the background. The next
+/generate-question call for that session builds its prompt the same way; if it
+matches a speculation, that result is served (waiting for it if still
+running) instead of starting a new model call.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+def _prompt_key(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class QuestionSpeculator:
+    def __init__(self, generate, workers=2, per_session=2, max_sessions=500, max_pending=8, wait_seconds=30):
+        """
+        generate: callable(prompt, prompt_type) -> question text.
+        per_session: speculative candidates kept per session (oldest dropped).
+        max_pending: speculations queued or running at once; beyond that new
+        ones are skipped so speculation never competes with live traffic.
+        wait_seconds: how long a matching, still-running speculation is awaited.
+        """
+        self._generate = generate
+        self.per_session = per_session
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='speculation')
+        self._sessions = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.started = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.errors = 0
+
+    def speculate(self, session_id, prompt, prompt_type):
+        """Start generating for `prompt`; returns False if skipped."""
+        key = _prompt_key(prompt)
+        with self._lock:
+            slots = self._sessions.get(session_id)
+            if slots is not None and key in slots:
+                return True
+            if self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+            self.started += 1
+            if slots is None:
+                slots = self._sessions[session_id] = OrderedDict()
+            self._sessions.move_to_end(session_id)
+            slots[key] = self._executor.submit(self._run, prompt, prompt_type)
+            while len(slots) > self.per_session:
+                self._drop(slots.popitem(last=False)[1])
+            while len(self._sessions) > self.max_sessions:
+                for future in self._sessions.popitem(last=False)[1].values():
+                    self._drop(future)
+        return True
+
+    def _run(self, prompt, prompt_type):
+        try:
+            return self._generate(prompt, prompt_type)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _drop(self, future):
+        """An unused speculation (caller holds the lock)."""
+        if future.cancel():
+            self._pending -= 1  # never started, so _run will not decrement
+        self.wasted += 1
+
+    def take(self, session_id, prompt):
+        """
+        The speculated question for `prompt`, or None when there is no match
+        (or it failed); the session's other candidates are discarded either way.
+        """
+        key = _prompt_key(prompt)
+        with self._lock:
+            slots = self._sessions.pop(session_id, None) or {}
+            future = slots.pop(key, None)
+            for other in slots.values():
+                self._drop(other)
+            if future is None:
+                self.misses += 1
+                return None
+        try:
+            question = future.result(timeout=self.wait_seconds)
+            with self._lock:
+                self.hits += 1
+            return question
+        except (FutureTimeoutError, Exception) as e:
+            print(f"Speculative question unavailable: {str(e) or type(e).__name__}")
+            with self._lock:
+                self.errors += 1
+                self.misses += 1
+            return None
+
+    def discard(self, session_id):
+        with self._lock:
+            for future in (self._sessions.pop(session_id, None) or {}).values():
+                self._drop(future)
+
+    def stats(self):
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                "started": self.started,
+                "skipped": self.skipped,
+                "pending": self._pending,
+                "hits": self.hits,
+                "misses": self.misses,
+                "wasted": self.wasted,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / served, 3) if served else 0.0,
+                "wasted_ratio": round(self.wasted / self.started, 3) if self.started else 0.0,
+            }
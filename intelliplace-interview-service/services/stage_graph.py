@@ -0,0 +1,55 @@
+"""
+Per-request execution of analysis stages on a shared worker pool.
+Independent stages run concurrently; each has its own deadline and a fallback
+value used when it times out or fails, so one slow stage only degrades its
+own part of the result.
+"""
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class StageGraph:
+    def __init__(self, executor):
+        self.executor = executor
+        self._stages = {}
+        self.timings = {}
+        self.status = {}
+
+    def submit(self, name, fn, *args, timeout=None, fallback=None):
+        """Start `fn(*args)` in the pool as stage `name`."""
+        submitted = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+        self._stages[name] = (self.executor.submit(run), submitted, timeout, fallback)
+
+    def __contains__(self, name):
+        return name in self._stages
+
+    def result(self, name):
+        """
+        Wait for stage `name` until its deadline (measured from submit).
+
+        Returns the stage's fallback on timeout or error; the outcome is
+        recorded in `status` as ok / timeout / error.
+        """
+        future, submitted, timeout, fallback = self._stages[name]
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - submitted))
+        try:
+            value = future.result(timeout=remaining)
+            self.status[name] = "ok"
+            return value
+        except FutureTimeoutError:
+            # The worker thread cannot be interrupted; it finishes in the background.
+            self.status[name] = "timeout"
+            self.timings.setdefault(name, round((time.perf_counter() - submitted) * 1000, 1))
+            return fallback
+        except Exception as e:
+            print(f"Stage {name} failed: {str(e)}")
+            self.status[name] = "error"
+            return fallback
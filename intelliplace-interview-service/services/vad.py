@@ -0,0 +1,105 @@
+"""
+Voice-activity detection for answer audio.
+Speech is found from frame energy and zero-crossing rate on a 10 ms grid:
+frames well above the recording's noise floor are speech, and quieter frames
+with a high crossing rate (fricatives such as "s" and "f") are kept too. Only
+the speech segments go on to transcription and acoustic features; the gaps
+between them give speech-ratio and pause statistics.
+"""
+import numpy as np
+
+from services.acoustic_features import FrameGrid
+
+FRAME_SECONDS = 0.03
+HOP_SECONDS = 0.01
+NOISE_PERCENTILE = 10
+# Speech frames: above ENERGY_FACTOR x noise floor and PEAK_RATIO x loudest frame
+ENERGY_FACTOR = 3.0
+PEAK_RATIO = 0.03
+MIN_RMS = 1e-3
+# Quieter frames still count as speech when their crossing rate is this high
+FRICATIVE_ENERGY_FACTOR = 1.5
+FRICATIVE_MIN_ZCR = 0.1
+
+
+class VoiceActivity:
+    def __init__(self, segments, padded_segments, duration):
+        """Segments are (start, end) pairs in seconds, in time order."""
+        self.segments = segments
+        self.padded_segments = padded_segments
+        self.duration = duration
+
+    @property
+    def has_speech(self):
+        return bool(self.segments)
+
+    def pauses(self):
+        return [b[0] - a[1] for a, b in zip(self.segments, self.segments[1:])]
+
+    def stats(self):
+        speech = sum(end - start for start, end in self.segments)
+        pauses = self.pauses()
+        return {
+            "duration_seconds": round(self.duration, 2),
+            "speech_seconds": round(speech, 2),
+            "speech_ratio": round(speech / self.duration, 3) if self.duration else 0.0,
+            "pause_count": len(pauses),
+            "mean_pause_seconds": round(float(np.mean(pauses)), 2) if pauses else 0.0,
+            "longest_pause_seconds": round(max(pauses), 2) if pauses else 0.0,
+            "leading_silence_seconds": round(self.segments[0][0], 2) if self.segments else round(self.duration, 2),
+            "trailing_silence_seconds": round(self.duration - self.segments[-1][1], 2) if self.segments else 0.0,
+        }
+
+    def voiced_clip(self, clip):
+        """The speech segments of `clip` (with padding) joined into one clip."""
+        rate = clip.sample_rate
+        parts = [clip.samples[int(start * rate):int(end * rate)] for start, end in self.padded_segments]
+        samples = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+        # Same clip type without importing services.audio (and librosa) here
+        return type(clip)(np.ascontiguousarray(samples, dtype=np.float32), rate)
+
+
+def _merge(segments, max_gap):
+    merged = []
+    for start, end in segments:
+        if merged and start - merged[-1][1] < max_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def detect_speech(clip, min_speech=0.1, min_pause=0.3, padding=0.1):
+    """
+    Speech segments of `clip`.
+
+    Gaps shorter than `min_pause` seconds are bridged, segments shorter than
+    `min_speech` are dropped, and `padding` seconds are kept on both sides of
+    each segment for trimming so word onsets and tails are not clipped.
+    """
+    rate = clip.sample_rate
+    duration = clip.duration
+    if not len(clip.samples):
+        return VoiceActivity([], [], duration)
+
+    hop = max(1, int(HOP_SECONDS * rate))
+    grid = FrameGrid(clip.samples, rate, frame_length=max(2, int(FRAME_SECONDS * rate)), hop_length=hop)
+    noise = float(np.percentile(grid.rms, NOISE_PERCENTILE))
+    threshold = max(noise * ENERGY_FACTOR, float(grid.rms.max()) * PEAK_RATIO, MIN_RMS)
+    speech = (grid.rms > threshold) | (
+        (grid.rms > max(noise * FRICATIVE_ENERGY_FACTOR, MIN_RMS)) & (grid.zcr > FRICATIVE_MIN_ZCR)
+    )
+
+    # Runs of speech frames; frame i is centred on sample i * hop
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    half = 0.5 * hop / rate
+    segments = [
+        (max(0.0, float(s * hop / rate - half)), min(duration, float((e - 1) * hop / rate + half)))
+        for s, e in zip(starts, ends)
+    ]
+    segments = [(s, e) for s, e in _merge(segments, min_pause) if e - s >= min_speech]
+    padded = _merge(
+        [(max(0.0, s - padding), min(duration, e + padding)) for s, e in segments], 0.0
+    )
+    return VoiceActivity(segments, padded, duration)
@@ -0,0 +1,51 @@
+"""
+Drift of the vectorized acoustic features from the librosa piptrack pipeline
+they replaced, on the synthetic signals of scripts/benchmark_audio_features.py.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from benchmark_audio_features import (  # noqa: E402
+    FEATURE_TOLERANCE, MEAN_SCORE_TOLERANCE, PITCH_TOLERANCE, SCORE_TOLERANCE,
+    legacy_features, legacy_score, relative_error, signals,
+)
+from services.acoustic_features import confidence_score, extract_features  # noqa: E402
+from services.audio import ANALYSIS_SAMPLE_RATE  # noqa: E402
+
+SIGNALS = list(signals(ANALYSIS_SAMPLE_RATE))
+
+
+@pytest.fixture(scope="module")
+def extracted():
+    """(new features, legacy features) per signal, computed once."""
+    return [
+        (extract_features(y, ANALYSIS_SAMPLE_RATE), legacy_features(y, ANALYSIS_SAMPLE_RATE))
+        for _, _, y, _ in SIGNALS
+    ]
+
+
+@pytest.mark.parametrize("i", range(len(SIGNALS)), ids=[f"{label}-{freq}Hz" for label, freq, _, _ in SIGNALS])
+def test_features_match_reference(i, extracted):
+    label, freq, _, voice_like = SIGNALS[i]
+    new, old = extracted[i]
+    assert relative_error(new["pitch_mean"], freq) <= PITCH_TOLERANCE
+    for key in ("energy_mean", "zcr_mean"):
+        assert relative_error(new[key], old[key]) <= FEATURE_TOLERANCE, key
+    if voice_like:
+        assert abs(confidence_score(new) - legacy_score(old)) <= SCORE_TOLERANCE
+
+
+def test_mean_voice_score_drift(extracted):
+    drifts = [
+        confidence_score(new) - legacy_score(old)
+        for (_, _, _, voice_like), (new, old) in zip(SIGNALS, extracted)
+        if voice_like
+    ]
+    assert abs(float(np.mean(drifts))) <= MEAN_SCORE_TOLERANCE